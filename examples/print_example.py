@@ -9,8 +9,6 @@ from pyipp.enums import IppOperation
 async def main() -> None:
     """Show example of printing via IPP print server."""
     pdf_file = "/path/to/pdf.pfd"
-    with open(pdf_file, "rb") as f:  # noqa: PTH123, ASYNC230
-        content = f.read()
 
     async with IPP("ipp://192.168.1.92:631/ipp/print") as ipp:
         response = await ipp.execute(
@@ -21,7 +19,8 @@ async def main() -> None:
                     "job-name": "My Test Job",
                     "document-format": "application/pdf",
                 },
-                "data": content,
+                # the file is streamed rather than read into memory
+                "data": pdf_file,
             },
         )
 
@@ -1,5 +1,8 @@
 """Asynchronous Python client for IPP."""
+from .cache import AttributeCache, HostCache
+from .coalesce import RequestCoalescer
 from .exceptions import (
+    IPPCircuitOpenError,
     IPPConnectionError,
     IPPConnectionUpgradeRequired,
     IPPError,
@@ -7,22 +10,51 @@ from .exceptions import (
     IPPResponseError,
     IPPVersionNotSupportedError,
 )
+from .fleet import (
+    AdaptiveScheduler,
+    CycleStats,
+    FleetPoller,
+    PollResult,
+    SessionManager,
+)
 from .ipp import IPP
 from .models import (
+    Event,
     Info,
     Marker,
     Printer,
     State,
     Uri,
 )
+from .receiver import NotificationReceiver
+from .retry import CircuitBreaker, RetryPolicy
+from .serializer import IppRequest
+from .transport import AiohttpTransport, StreamTransport, Transport
 
 __all__ = [
+    "AdaptiveScheduler",
+    "AiohttpTransport",
+    "AttributeCache",
+    "CircuitBreaker",
+    "CycleStats",
+    "Event",
+    "FleetPoller",
+    "HostCache",
+    "PollResult",
     "Info",
     "Marker",
+    "NotificationReceiver",
     "Printer",
+    "RequestCoalescer",
+    "RetryPolicy",
     "State",
+    "StreamTransport",
+    "Transport",
     "Uri",
     "IPP",
+    "IppRequest",
+    "SessionManager",
+    "IPPCircuitOpenError",
     "IPPConnectionError",
     "IPPConnectionUpgradeRequired",
     "IPPError",
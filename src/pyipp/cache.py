@@ -0,0 +1,155 @@
+"""Caches for IPP."""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .const import DEFAULT_ATTRIBUTE_TTLS, VOLATILE_PRINTER_ATTRIBUTES
+from .enums import IppOperation
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from os import PathLike
+
+    from .ipp import IPP
+
+
+class HostCache:
+    """Facts learned about hosts, such as the IPP version they support.
+
+    The facts are plain JSON values keyed by "host:port", see save().
+    """
+
+    def __init__(self, data: Mapping[str, Mapping[str, Any]] | None = None) -> None:
+        """Initialize the cache, with the facts of a previous one if given."""
+        self._hosts: dict[str, dict[str, Any]] = {
+            host: dict(facts) for host, facts in (data or {}).items()
+        }
+
+    def get(self, host: str, key: str, default: Any = None) -> Any:
+        """Return a fact about the host."""
+        return self._hosts.get(host, {}).get(key, default)
+
+    def set(self, host: str, key: str, value: Any) -> None:
+        """Remember a fact about the host."""
+        self._hosts.setdefault(host, {})[key] = value
+
+    def clear(self, host: str | None = None) -> None:
+        """Forget the facts about the host, or about all hosts."""
+        if host is None:
+            self._hosts.clear()
+        else:
+            self._hosts.pop(host, None)
+
+    def ipp_version(self, host: str) -> tuple[int, int] | None:
+        """Return the IPP version negotiated with the host, if any."""
+        version = self.get(host, "ipp-version")
+
+        return None if version is None else (version[0], version[1])
+
+    def set_ipp_version(self, host: str, version: tuple[int, int]) -> None:
+        """Remember the IPP version negotiated with the host."""
+        self.set(host, "ipp-version", list(version))
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the facts about all hosts."""
+        return {host: dict(facts) for host, facts in self._hosts.items()}
+
+    def save(self, path: str | PathLike[str]) -> None:
+        """Save the cache as JSON."""
+        with open(path, "w", encoding="utf-8") as file:  # noqa: PTH123
+            json.dump(self._hosts, file, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str | PathLike[str]) -> HostCache:
+        """Load a cache saved before, an empty one if there is none."""
+        try:
+            with open(path, encoding="utf-8") as file:  # noqa: PTH123
+                return cls(json.load(file))
+        except FileNotFoundError:
+            return cls()
+
+
+@dataclass
+class _PrinterAttributes:
+    """Attributes cached for a single printer."""
+
+    attributes: dict[str, Any] = field(default_factory=dict)
+    fetched: dict[str, float] = field(default_factory=dict)
+    config_change_time: Any = None
+
+
+class AttributeCache:
+    """Cache of printer attributes, with a ttl per attribute group.
+
+    Volatile attributes are requested on every call, the groups once stale,
+    and all of them once the printer-config-change-time moved.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttls: Mapping[str, float] = DEFAULT_ATTRIBUTE_TTLS,
+        volatile: Iterable[str] = VOLATILE_PRINTER_ATTRIBUTES,
+    ) -> None:
+        """Initialize the cache."""
+        self.ttls = dict(ttls)
+        self.volatile = list(dict.fromkeys([*volatile, "printer-config-change-time"]))
+
+        self._printers: dict[str, _PrinterAttributes] = {}
+
+    async def printer_attributes(self, ipp: IPP) -> dict[str, Any]:
+        """Return the attributes of the printer, fetching those needed."""
+        cached = self._printers.setdefault(ipp.printer_uri, _PrinterAttributes())
+
+        now = time.monotonic()
+        stale = [
+            group
+            for group, ttl in self.ttls.items()
+            if group not in cached.fetched or now >= cached.fetched[group] + ttl
+        ]
+
+        attributes = await self._fetch(ipp, stale)
+        config_change_time = attributes.get("printer-config-change-time")
+
+        if (
+            config_change_time != cached.config_change_time
+            and cached.fetched
+            and len(stale) < len(self.ttls)
+        ):
+            cached.attributes.clear()
+            stale = list(self.ttls)
+            attributes = await self._fetch(ipp, stale)
+            config_change_time = attributes.get("printer-config-change-time")
+
+        cached.config_change_time = config_change_time
+        cached.fetched.update(dict.fromkeys(stale, now))
+        cached.attributes.update(
+            (name, value)
+            for name, value in attributes.items()
+            if name not in self.volatile
+        )
+
+        return {**cached.attributes, **attributes}
+
+    async def _fetch(self, ipp: IPP, groups: list[str]) -> dict[str, Any]:
+        """Fetch the volatile attributes and the groups of the printer."""
+        response = await ipp.execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            {
+                "operation-attributes-tag": {
+                    "requested-attributes": [*self.volatile, *groups],
+                },
+            },
+        )
+
+        return dict(next(iter(response["printers"]), {}))
+
+    def invalidate(self, printer_uri: str | None = None) -> None:
+        """Forget the attributes of the printer at the uri, or of all."""
+        if printer_uri is None:
+            self._printers.clear()
+        else:
+            self._printers.pop(printer_uri, None)
@@ -0,0 +1,88 @@
+"""Request Coalescing for IPP."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from .retry import IDEMPOTENT_OPERATIONS
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Hashable, Iterable
+
+
+class RequestCoalescer:
+    """Share one request between concurrent callers sending the same one.
+
+    Callers get the same parsed result, to be treated as read-only, which is
+    kept for ttl seconds. Only the given operations are coalesced.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 0.0,
+        operations: Iterable[int] = IDEMPOTENT_OPERATIONS,
+    ) -> None:
+        """Initialize the coalescer."""
+        self.ttl = ttl
+        self.operations = frozenset(operations)
+
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self._expiry: list[tuple[float, int, Hashable]] = []
+        self._counter = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests in flight."""
+        return len(self._in_flight)
+
+    async def run(
+        self,
+        key: Hashable,
+        request: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the result of the request, sharing it with other callers."""
+        if self.ttl and self._results:
+            self._evict(time.monotonic())
+
+            if (cached := self._results.get(key)) is not None:
+                return cached[1]
+
+        if (future := self._in_flight.get(key)) is None:
+            future = self._in_flight[key] = asyncio.ensure_future(request())
+            future.add_done_callback(lambda done: self._done(key, done))
+
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        """Keep the result of a request completed."""
+        del self._in_flight[key]
+
+        # retrieved here too, as all callers might have been cancelled
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        if self.ttl:
+            expires = time.monotonic() + self.ttl
+            self._results[key] = (expires, future.result())
+
+            # the counter breaks ties, as keys may not be comparable
+            self._counter += 1
+            heapq.heappush(self._expiry, (expires, self._counter, key))
+
+    def _evict(self, now: float) -> None:
+        """Forget the results which expired."""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, _, key = heapq.heappop(self._expiry)
+
+            # unless kept again since
+            if (cached := self._results.get(key)) is not None and cached[0] == expires:
+                del self._results[key]
+
+    def clear(self) -> None:
+        """Forget the results kept."""
+        self._results.clear()
+        self._expiry.clear()
@@ -44,5 +44,40 @@ DEFAULT_PRINTER_ATTRIBUTES = [
     "marker-types",
 ]
 
+# attributes which change all the time, requested on every poll, see AttributeCache
+VOLATILE_PRINTER_ATTRIBUTES = [
+    "printer-state",
+    "printer-state-message",
+    "printer-state-reasons",
+    "printer-state-change-time",
+    "printer-config-change-time",
+    "printer-up-time",
+    "printer-supply",
+    "marker-levels",
+]
+
+# attributes telling whether anything changed, see IPP.delta_polling
+CHANGE_PRINTER_ATTRIBUTES = [
+    "printer-state-change-time",
+    "printer-config-change-time",
+    "printer-up-time",
+]
+
+# seconds the attributes of each group are cached, see AttributeCache
+DEFAULT_ATTRIBUTE_TTLS = {"printer-description": 3600.0, "job-template": 86400.0}
+
+DEFAULT_PRINTER_EVENTS = ["printer-state-changed", "printer-config-changed"]
+
+DEFAULT_JOB_EVENTS = ["job-state-changed", "job-completed"]
+
+# seconds a subscription lasts unless renewed, see IPP.events()
+DEFAULT_LEASE_DURATION = 3600
+
 DEFAULT_PORT = 631
 DEFAULT_PROTO_VERSION = (2, 0)
+
+# versions stepped down through when a server does not support one
+PROTO_VERSIONS = ((2, 0), (1, 1), (1, 0))
+
+# seconds between polls of a printer by state, see AdaptiveScheduler
+DEFAULT_POLL_INTERVALS = {"idle": 60.0, "printing": 5.0, "stopped": 10.0}
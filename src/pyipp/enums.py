@@ -1,4 +1,6 @@
 """Enumerators for IPP."""
+from __future__ import annotations
+
 from enum import IntEnum
 
 
@@ -332,3 +334,9 @@ ATTRIBUTE_ENUM_MAP = {
     "print-quality-supported": IppPrintQuality, # RFC8011
     "status-code": IppStatus, # RFC8011
 }
+
+# value to member lookup, avoids calling the enum for every decoded value
+ATTRIBUTE_ENUM_VALUES: dict[str, dict[int, IntEnum]] = {
+    name: {member.value: member for member in enum_class}
+    for name, enum_class in ATTRIBUTE_ENUM_MAP.items()
+}
@@ -23,3 +23,7 @@ class IPPResponseError(IPPError):
 
 class IPPVersionNotSupportedError(IPPError):
     """IPP version not supported."""
+
+
+class IPPCircuitOpenError(IPPConnectionError):
+    """IPP server known to be unreachable, request not sent."""
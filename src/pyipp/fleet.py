@@ -0,0 +1,515 @@
+"""Fleet Management for IPP."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+import aiohttp
+
+from .const import DEFAULT_POLL_INTERVALS
+from .ipp import IPP
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Mapping
+    from concurrent.futures import Executor
+
+    from .cache import AttributeCache, HostCache
+    from .coalesce import RequestCoalescer
+    from .models import Printer
+    from .retry import CircuitBreaker, RetryPolicy
+
+
+class SessionManager:
+    """Shared HTTP session for the IPP clients of a printer fleet.
+
+    The manager owns a single connector, so all of its clients share one
+    connection pool and DNS cache, and connections are kept alive and
+    reused between requests rather than established for each client.
+
+    The session is created when first acquired and closed when the last
+    reference to it is released. Clients acquire a reference on their
+    first request and release it when closed. Using the manager as an
+    async context manager holds a reference too, which keeps the pool
+    open while clients come and go.
+
+    The retry policy, circuit breaker, caches, coalescer and executor
+    given are shared by all of its clients.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 2,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: int | None = 300,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        host_cache: HostCache | None = None,
+        coalescer: RequestCoalescer | None = None,
+        attribute_cache: AttributeCache | None = None,
+        offload_threshold: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """Initialize the manager with the connection pool limits."""
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.host_cache = host_cache
+        self.coalescer = coalescer
+        self.attribute_cache = attribute_cache
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+
+        self.session: aiohttp.ClientSession | None = None
+        self.references = 0
+
+    def acquire(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it if needed."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.ttl_dns_cache,
+                ),
+            )
+
+        self.references += 1
+
+        return self.session
+
+    async def release(self) -> None:
+        """Release a reference to the session, closing it after the last."""
+        self.references = max(self.references - 1, 0)
+
+        if self.references == 0 and self.session is not None:
+            session, self.session = self.session, None
+            await session.close()
+
+    def client(self, host: str, **kwargs: Any) -> IPP:
+        """Return an IPP client using the shared session."""
+        kwargs.setdefault("retry_policy", self.retry_policy)
+        kwargs.setdefault("circuit_breaker", self.circuit_breaker)
+        kwargs.setdefault("host_cache", self.host_cache)
+        kwargs.setdefault("coalescer", self.coalescer)
+        kwargs.setdefault("attribute_cache", self.attribute_cache)
+        kwargs.setdefault("offload_threshold", self.offload_threshold)
+        kwargs.setdefault("executor", self.executor)
+
+        return IPP(host, session_manager=self, **kwargs)
+
+    async def __aenter__(self) -> SessionManager:  # noqa: PYI034
+        """Async enter."""
+        self.acquire()
+
+        return self
+
+    async def __aexit__(self, *_exec_info: object) -> None:
+        """Async exit."""
+        await self.release()
+
+
+@dataclass(frozen=True)
+class PollResult:
+    """Object holding the result of polling a printer."""
+
+    uri: str
+    printer: Printer | None
+    error: Exception | None
+    started: float
+    duration: float
+
+
+@dataclass(frozen=True)
+class CycleStats:
+    """Object holding the statistics of a polling cycle."""
+
+    cycle: int
+    polled: int
+    failed: int
+    duration: float
+    poll_min: float
+    poll_mean: float
+    poll_p95: float
+    poll_max: float
+
+    @property
+    def throughput(self) -> float:
+        """Return the number of printers polled per second."""
+        return self.polled / self.duration if self.duration > 0 else 0.0
+
+    @staticmethod
+    def from_durations(
+        cycle: int,
+        duration: float,
+        durations: list[float],
+        failed: int,
+    ) -> CycleStats:
+        """Return CycleStats object from the poll durations of a cycle."""
+        polled = len(durations)
+        durations = sorted(durations) or [0.0]
+
+        return CycleStats(
+            cycle=cycle,
+            polled=polled,
+            failed=failed,
+            duration=duration,
+            poll_min=durations[0],
+            poll_mean=sum(durations) / len(durations),
+            poll_p95=durations[int(0.95 * (len(durations) - 1))],
+            poll_max=durations[-1],
+        )
+
+
+async def _poll(uri: str, client: IPP) -> PollResult:
+    """Poll a single printer."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    try:
+        printer = await client.printer()
+    except Exception as exc:  # noqa: BLE001  # one printer must not stop the cycle
+        return PollResult(uri, None, exc, started, loop.time() - started)
+
+    return PollResult(uri, printer, None, started, loop.time() - started)
+
+
+class FleetPoller:
+    """Poll the printers of a fleet with bounded concurrency.
+
+    Each cycle polls every printer once with printer(), using at most
+    concurrency requests at a time. The start of each poll is delayed by
+    a random jitter, so requests are spread out rather than sent in a
+    burst. Results are yielded as they complete, and passed to the
+    callback if one is given. The statistics of the last cycle are kept
+    in stats and passed to the on_cycle callback.
+
+    Clients are kept between cycles and share the connection pool of the
+    session manager, one is created if none is given.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        uris: Iterable[str],
+        *,
+        concurrency: int = 50,
+        interval: float = 60.0,
+        jitter: float = 1.0,
+        session_manager: SessionManager | None = None,
+        callback: Callable[[PollResult], Any] | None = None,
+        on_cycle: Callable[[CycleStats], Any] | None = None,
+        **client_kwargs: Any,
+    ) -> None:
+        """Initialize the poller."""
+        self.concurrency = concurrency
+        self.interval = interval
+        self.jitter = jitter
+        self.session_manager = session_manager or SessionManager(
+            limit=concurrency,
+        )
+        self.callback = callback
+        self.on_cycle = on_cycle
+        self.stats: CycleStats | None = None
+
+        self.clients = {
+            uri: self.session_manager.client(uri, **client_kwargs) for uri in uris
+        }
+        self._cycle = 0
+
+    async def _worker(
+        self,
+        pending: asyncio.Queue[tuple[float, str]],
+        results: asyncio.Queue[PollResult],
+    ) -> None:
+        """Poll printers from the queue until it is empty."""
+        loop = asyncio.get_running_loop()
+
+        while not pending.empty():
+            start, uri = pending.get_nowait()
+
+            if (delay := start - loop.time()) > 0:
+                await asyncio.sleep(delay)
+
+            await results.put(await _poll(uri, self.clients[uri]))
+
+    async def poll(self) -> AsyncIterator[PollResult]:
+        """Poll every printer once and yield the results as they complete."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self._cycle += 1
+
+        pending: asyncio.Queue[tuple[float, str]] = asyncio.Queue()
+        results: asyncio.Queue[PollResult] = asyncio.Queue()
+
+        for start in sorted(
+            (started + random.uniform(0, self.jitter), uri)  # nosec  # noqa: S311
+            for uri in self.clients
+        ):
+            pending.put_nowait(start)
+
+        workers = [
+            asyncio.create_task(self._worker(pending, results))
+            for _ in range(min(self.concurrency, len(self.clients)))
+        ]
+        durations: list[float] = []
+        failed = 0
+
+        try:
+            for _ in range(len(self.clients)):
+                result = await results.get()
+                durations.append(result.duration)
+                failed += result.error is not None
+
+                if self.callback is not None and inspect.isawaitable(
+                    callback_result := self.callback(result),
+                ):
+                    await callback_result
+
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        self.stats = CycleStats.from_durations(
+            self._cycle,
+            loop.time() - started,
+            durations,
+            failed,
+        )
+
+        if self.on_cycle is not None and inspect.isawaitable(
+            cycle_result := self.on_cycle(self.stats),
+        ):
+            await cycle_result
+
+    async def run(self, cycles: int | None = None) -> AsyncIterator[PollResult]:
+        """Poll every printer each interval, for a number of cycles or forever."""
+        loop = asyncio.get_running_loop()
+
+        async with self.session_manager:
+            cycle = 0
+
+            while cycles is None or cycle < cycles:
+                started = loop.time()
+                cycle += 1
+
+                async for result in self.poll():
+                    yield result
+
+                if cycles is not None and cycle >= cycles:
+                    break
+
+                await asyncio.sleep(max(self.interval - (loop.time() - started), 0))
+
+    def __aiter__(self) -> AsyncIterator[PollResult]:
+        """Poll every printer each interval."""
+        return self.run()
+
+    async def close(self) -> None:
+        """Close the clients of the poller."""
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
+
+
+class AdaptiveScheduler:
+    """Poll the printers of a fleet at intervals adapted to their state.
+
+    Each printer is polled at the interval for its state, shortened to
+    reasons_interval while it reports state reasons. Within that bound
+    the interval is halved whenever a poll sees the state, reasons or
+    marker levels change, and grows again while they stay the same, so
+    busy printers are polled often and idle ones rarely. Intervals never
+    drop below min_interval, nor exceed freshness if given, the maximum
+    age of the data allowed. Printers that fail to respond back off up
+    to max_interval.
+
+    Printers are kept in a priority queue keyed by the time their next
+    poll is due, with at most concurrency polls in flight. Results are
+    yielded by run() as they complete, and passed to the callback if
+    one is given.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        uris: Iterable[str],
+        *,
+        intervals: Mapping[str, float] | None = None,
+        reasons_interval: float = 15.0,
+        min_interval: float = 2.0,
+        max_interval: float = 300.0,
+        freshness: float | None = None,
+        jitter: float = 1.0,
+        concurrency: int = 50,
+        session_manager: SessionManager | None = None,
+        callback: Callable[[PollResult], Any] | None = None,
+        **client_kwargs: Any,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.intervals = dict(intervals or DEFAULT_POLL_INTERVALS)
+        self.reasons_interval = reasons_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.freshness = freshness
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.session_manager = session_manager or SessionManager(
+            limit=concurrency,
+        )
+        self.callback = callback
+        self.polls = 0
+
+        self.clients = {
+            uri: self.session_manager.client(uri, **client_kwargs) for uri in uris
+        }
+        self.poll_intervals: dict[str, float] = {}
+
+        self._fingerprints: dict[str, tuple[Any, ...]] = {}
+        self._queue: list[tuple[float, int, str]] = []
+        self._sequence = 0
+        self._wakeup: asyncio.Event | None = None
+
+    def _schedule(self, uri: str, due: float) -> None:
+        """Queue the next poll of a printer."""
+        self._sequence += 1
+        heapq.heappush(self._queue, (due, self._sequence, uri))
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_interval(self, result: PollResult) -> float:
+        """Return the interval until the next poll of a printer."""
+        current = self.poll_intervals.get(result.uri)
+
+        if (printer := result.printer) is None:
+            return min((current or self.min_interval) * 2, self.max_interval)
+
+        base = self.intervals.get(
+            printer.state.printer_state,
+            max(self.intervals.values()),
+        )
+        if printer.state.reasons:
+            base = min(base, self.reasons_interval)
+
+        fingerprint = (
+            printer.state.printer_state,
+            printer.state.reasons,
+            tuple(marker.level for marker in printer.markers),
+        )
+        previous = self._fingerprints.get(result.uri, fingerprint)
+        self._fingerprints[result.uri] = fingerprint
+
+        if current is None:
+            interval = base
+        elif fingerprint != previous:
+            interval = min(current, base) / 2
+        else:
+            interval = current * 1.5
+
+        interval = min(max(interval, self.min_interval), base)
+
+        if self.freshness is not None:
+            interval = min(interval, self.freshness)
+
+        return interval
+
+    async def _poll(
+        self,
+        uri: str,
+        results: asyncio.Queue[PollResult],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Poll a printer and queue its next poll."""
+        try:
+            result = await _poll(uri, self.clients[uri])
+            self.polls += 1
+
+            self.poll_intervals[uri] = interval = self._next_interval(result)
+            self._schedule(uri, result.started + result.duration + interval)
+
+            await results.put(result)
+        finally:
+            semaphore.release()
+
+    async def _dispatch(self, results: asyncio.Queue[PollResult]) -> None:
+        """Start the polls that are due, at most concurrency at a time."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        wakeup = self._wakeup = asyncio.Event()
+        tasks: set[asyncio.Task[None]] = set()
+
+        try:
+            while True:
+                await semaphore.acquire()
+
+                while not self._queue or self._queue[0][0] > loop.time():
+                    # woken by the next due time, or by a poll queued before it
+                    wakeup.clear()
+                    timer = (
+                        loop.call_at(self._queue[0][0], wakeup.set)
+                        if self._queue
+                        else None
+                    )
+
+                    try:
+                        await wakeup.wait()
+                    finally:
+                        if timer is not None:
+                            timer.cancel()
+
+                _, _, uri = heapq.heappop(self._queue)
+
+                task = asyncio.create_task(self._poll(uri, results, semaphore))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> AsyncIterator[PollResult]:
+        """Poll the printers when due and yield the results as they complete."""
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue[PollResult] = asyncio.Queue()
+
+        self._queue.clear()
+        for uri in self.clients:
+            self._schedule(
+                uri,
+                loop.time() + random.uniform(0, self.jitter),  # nosec  # noqa: S311
+            )
+
+        async with self.session_manager:
+            dispatcher = asyncio.create_task(self._dispatch(results))
+
+            try:
+                while True:
+                    result = await results.get()
+
+                    if self.callback is not None and inspect.isawaitable(
+                        callback_result := self.callback(result),
+                    ):
+                        await callback_result
+
+                    yield result
+            finally:
+                dispatcher.cancel()
+                await asyncio.gather(dispatcher, return_exceptions=True)
+
+    def __aiter__(self) -> AsyncIterator[PollResult]:
+        """Poll the printers when due."""
+        return self.run()
+
+    async def close(self) -> None:
+        """Close the clients of the scheduler."""
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
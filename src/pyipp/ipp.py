@@ -2,25 +2,35 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
+import os
+import ssl
 import sys
+from contextlib import suppress
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from importlib import metadata
 from socket import gaierror
 from struct import error as structerror
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
 import aiohttp
 from deepmerge import always_merger
 from yarl import URL
 
 from .const import (
+    CHANGE_PRINTER_ATTRIBUTES,
     DEFAULT_CHARSET,
     DEFAULT_CHARSET_LANGUAGE,
+    DEFAULT_LEASE_DURATION,
     DEFAULT_PRINTER_ATTRIBUTES,
+    DEFAULT_PRINTER_EVENTS,
     DEFAULT_PROTO_VERSION,
+    PROTO_VERSIONS,
 )
 from .enums import IppOperation, IppStatus
 from .exceptions import (
+    IPPCircuitOpenError,
     IPPConnectionError,
     IPPConnectionUpgradeRequired,
     IPPError,
@@ -28,12 +38,22 @@ from .exceptions import (
     IPPResponseError,
     IPPVersionNotSupportedError,
 )
-from .models import Printer
+from .lazy import LazyResponse
+from .models import Event, Printer
 from .parser import parse as parse_response
-from .serializer import encode_dict
+from .retry import IDEMPOTENT_OPERATIONS
+from .serializer import IppRequest, RequestTemplate, encode_dict, encode_stream
+from .stream import StreamParser, build_response
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import AsyncIterator, Iterable, Mapping
+    from concurrent.futures import Executor
+
+    from .cache import AttributeCache, HostCache
+    from .coalesce import RequestCoalescer
+    from .fleet import SessionManager
+    from .retry import CircuitBreaker, RetryPolicy
+    from .transport import Transport
 
 if sys.version_info >= (3, 11):
     from asyncio import timeout
@@ -42,6 +62,21 @@ else:
 
 VERSION = metadata.version(__package__)
 
+_ResponseT = TypeVar("_ResponseT", bound="Mapping[str, Any]")
+
+
+@lru_cache(maxsize=2)
+def _ssl_context(verify_ssl: bool) -> ssl.SSLContext:  # noqa: FBT001
+    """Return the TLS context shared by all clients, for session resumption."""
+    context = ssl.create_default_context()
+
+    if not verify_ssl:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    return context
+
+
 @dataclass
 class IPP:
     """Main class for handling connections with IPP servers."""
@@ -57,10 +92,28 @@ class IPP:
     verify_ssl: bool = False
     user_agent: str | None = None
     ipp_version: tuple[int, int] = DEFAULT_PROTO_VERSION
+    session_manager: SessionManager | None = None
+    retry_policy: RetryPolicy | None = None
+    circuit_breaker: CircuitBreaker | None = None
+    host_cache: HostCache | None = None
+    tls_upgrade: bool = False
+    ssl_context: ssl.SSLContext | None = None
+    transport: Transport | None = None
+    coalescer: RequestCoalescer | None = None
+    attribute_cache: AttributeCache | None = None
+    delta_polling: bool = False
+    offload_threshold: int | None = None
+    executor: Executor | None = None
 
     _close_session: bool = False
+    _release_session: bool = False
     _printer_uri: str = ""
+    _host_key: str = ""
     _printer: Printer | None = None
+    _printer_template: tuple[tuple[str, tuple[int, int]], RequestTemplate] | None = None
+    _change_template: tuple[tuple[str, tuple[int, int]], RequestTemplate] | None = None
+    _change_times: tuple[Any, Any] | None = None
+    _delta_supported: bool = True
 
     def __post_init__(self) -> None:
         """Initialize connection parameters."""
@@ -79,6 +132,8 @@ class IPP:
         else:
             self._printer_uri = self._build_printer_uri()
 
+        self._host_key = f"{self.host}:{self.port}"
+
         if self.user_agent is None:
             self.user_agent = f"PythonIPP/{VERSION}"
 
@@ -87,8 +142,129 @@ class IPP:
         uri: str = "",
         data: Any | None = None,
         params: Mapping[str, str] | None = None,
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
     ) -> bytes:
-        """Handle a request to an IPP server."""
+        """Handle a request to an IPP server.
+
+        The request is sent over the transport if one is given, unless the
+        document is streamed, which the aiohttp session is used for.
+
+        A long poll timing out is expected, so it does not count as a
+        failure of the host for the circuit breaker.
+        """
+        if isinstance(data, dict) and isinstance(data.get("data", b""), bytes):
+            data = encode_dict(data)
+        elif isinstance(data, RequestTemplate):
+            data = data.encode()
+
+        if self.transport is None or uri or params or not isinstance(data, bytes):
+            response = await self._response(
+                uri,
+                data,
+                params,
+                request_timeout,
+                long_poll=long_poll,
+            )
+
+            return await response.read()
+
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow(self._host_key):
+            raise IPPCircuitOpenError(
+                "IPP server is unreachable, request not sent.",
+            )
+
+        try:
+            async with timeout(request_timeout or self.request_timeout):
+                reply = await self.transport.post(
+                    self.host,
+                    self.port,
+                    self.base_path,
+                    data,
+                    self._headers(),
+                    (self.ssl_context or _ssl_context(self.verify_ssl))
+                    if self.tls
+                    else None,
+                    idempotent=int.from_bytes(data[2:4], "big")
+                    in IDEMPOTENT_OPERATIONS,
+                )
+        except asyncio.TimeoutError as exc:
+            if breaker is not None and not long_poll:
+                breaker.record_failure(self._host_key)
+
+            raise IPPConnectionError(
+                "Timeout occurred while connecting to IPP server.",
+            ) from exc
+        except IPPConnectionError:
+            if breaker is not None:
+                breaker.record_failure(self._host_key)
+
+            raise
+
+        if breaker is not None:
+            breaker.record_success(self._host_key)
+
+        self._raise_for_http_status(
+            reply.status,
+            reply.headers,
+            reply.body,
+        )
+
+        return reply.body
+
+    def _headers(self) -> dict[str, str]:
+        """Return the HTTP headers sent with every request."""
+        headers = {
+            "User-Agent": str(self.user_agent),
+            "Content-Type": "application/ipp",
+            "Accept": "application/ipp, text/plain, */*",
+        }
+
+        if self.username and self.password:
+            headers["Authorization"] = aiohttp.BasicAuth(
+                self.username,
+                self.password,
+            ).encode()
+
+        return headers
+
+    @staticmethod
+    def _raise_for_http_status(
+        status: int,
+        headers: Mapping[str, str],
+        content: bytes,
+    ) -> None:
+        """Raise for HTTP status codes that are not successful."""
+        if status == 426:
+            raise IPPConnectionUpgradeRequired(
+                "Connection upgrade required while communicating with IPP server.",
+                {"upgrade": headers.get("Upgrade")},
+            )
+
+        if (status // 100) in [4, 5]:
+            raise IPPResponseError(
+                f"HTTP {status}",  # noqa: EM102
+                {
+                    "content-type": headers.get("Content-Type"),
+                    "message": content.decode("utf8"),
+                    "retry-after": headers.get("Retry-After"),
+                    "status-code": status,
+                },
+            )
+
+    # pylint: disable=R0912
+    async def _response(  # noqa: PLR0912
+        self,
+        uri: str = "",
+        data: Any | None = None,
+        params: Mapping[str, str] | None = None,
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
+    ) -> aiohttp.ClientResponse:
+        """Send a request to an IPP server and return the unread response."""
         scheme = "https" if self.tls else "http"
 
         method = "POST"
@@ -99,63 +275,71 @@ class IPP:
             path=self.base_path,
         ).join(URL(uri))
 
-        auth = None
-        if self.username and self.password:
-            auth = aiohttp.BasicAuth(self.username, self.password)
-
-        headers = {
-            "User-Agent": self.user_agent,
-            "Content-Type": "application/ipp",
-            "Accept": "application/ipp, text/plain, */*",
-        }
+        headers = self._headers()
 
         if self.session is None:
-            self.session = aiohttp.ClientSession()
-            self._close_session = True
+            if self.session_manager is not None:
+                self.session = self.session_manager.acquire()
+                self._release_session = True
+            else:
+                self.session = aiohttp.ClientSession()
+                self._close_session = True
 
         if isinstance(data, dict):
-            data = encode_dict(data)
+            if isinstance(data.get("data", b""), bytes):
+                data = encode_dict(data)
+            else:
+                # streamed with chunked transfer encoding, never held in memory
+                data = encode_stream(data)
+        elif isinstance(data, RequestTemplate):
+            data = data.encode()
+
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow(self._host_key):
+            raise IPPCircuitOpenError(
+                "IPP server is unreachable, request not sent.",
+            )
 
         try:
-            async with timeout(self.request_timeout):
+            async with timeout(request_timeout or self.request_timeout):
                 response = await self.session.request(
                     method,
                     url,
-                    auth=auth,
                     data=data,
                     params=params,
                     headers=headers,
-                    ssl=self.verify_ssl,
+                    ssl=self.ssl_context or _ssl_context(self.verify_ssl),
                 )
         except asyncio.TimeoutError as exc:
+            if breaker is not None and not long_poll:
+                breaker.record_failure(self._host_key)
+
             raise IPPConnectionError(
                 "Timeout occurred while connecting to IPP server.",
             ) from exc
         except (aiohttp.ClientError, gaierror) as exc:
+            if breaker is not None:
+                breaker.record_failure(self._host_key)
+
             raise IPPConnectionError(
                 "Error occurred while communicating with IPP server.",
             ) from exc
 
-        if response.status == 426:
-            raise IPPConnectionUpgradeRequired(
-                "Connection upgrade required while communicating with IPP server.",
-                {"upgrade": response.headers.get("Upgrade")},
-            )
+        if breaker is not None:
+            breaker.record_success(self._host_key)
 
         if (response.status // 100) in [4, 5]:
             content = await response.read()
             response.close()
 
-            raise IPPResponseError(
-                f"HTTP {response.status}",  # noqa: EM102
-                {
-                    "content-type": response.headers.get("Content-Type"),
-                    "message": content.decode("utf8"),
-                    "status-code": response.status,
-                },
-            )
+            self._raise_for_http_status(response.status, response.headers, content)
+
+        return response
 
-        return await response.read()
+    @property
+    def printer_uri(self) -> str:
+        """Return the printer uri requests are sent for."""
+        return self._printer_uri
 
     def _build_printer_uri(self) -> str:
         scheme = "ipps" if self.tls else "ipp"
@@ -167,71 +351,640 @@ class IPP:
             path=self.base_path,
         ).human_repr()
 
-    def _message(self, operation: IppOperation, msg: dict[str, Any]) -> dict[str, Any]:
+    def _message(
+        self,
+        operation: IppOperation,
+        msg: dict[str, Any],
+        version: tuple[int, int] | None = None,
+    ) -> dict[str, Any]:
         """Build a request message to be sent to the server."""
         base = {
-            "version": self.ipp_version,
+            "version": version or self.ipp_version,
             "operation": operation,
             "request-id": None,  # will get added by serializer if one isn't given
-            "operation-attributes-tag": {  # these are required to be in this order
-                "attributes-charset": DEFAULT_CHARSET,
-                "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
-                "printer-uri": self._printer_uri,
-                "requesting-user-name": "PythonIPP",
-            },
+            "operation-attributes-tag": self._operation_attributes(),
         }
 
         return always_merger.merge(base, msg)
 
-    async def execute(
+    def _operation_attributes(self) -> dict[str, Any]:
+        """Return the operation attributes sent with every request."""
+        return {  # these are required to be in this order
+            "attributes-charset": DEFAULT_CHARSET,
+            "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
+            "printer-uri": self._printer_uri,
+            "requesting-user-name": "PythonIPP",
+        }
+
+    def _prepare(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        version: tuple[int, int] | None = None,
+    ) -> dict[str, Any] | RequestTemplate | bytes | AsyncIterator[bytes]:
+        """Build a request message unless a template or a request is given.
+
+        Requests are encoded right away, or as a stream for documents other
+        than bytes, without merging them into a message dict. They are sent
+        with the given IPP version, by default the one of the client.
+        """
+        if (
+            isinstance(message, (RequestTemplate, IppRequest))
+            and message.operation != operation
+        ):
+            # the operation decides whether the request is retried and shared
+            raise ValueError(
+                f"Request is for {message.operation.name}, not {operation.name}",  # noqa: EM102
+            )
+
+        if version is None:
+            self._apply_host_cache()
+            version = self.ipp_version
+
+        if isinstance(message, RequestTemplate):
+            if message.version > version:
+                # built before the version was negotiated down
+                return message.encode(version=version)
+
+            return message
+
+        if isinstance(message, IppRequest):
+            if message.data is None or isinstance(message.data, bytes):
+                return message.encode(self._operation_attributes(), version)
+
+            return message.encode_stream(self._operation_attributes(), version)
+
+        return self._message(operation, message, version)
+
+    def _apply_host_cache(self) -> None:
+        """Use the IPP version and scheme the host cache knows for the host."""
+        cache = self.host_cache
+        if cache is None:
+            return
+
+        if (version := cache.ipp_version(self._host_key)) is not None:
+            self.ipp_version = min(self.ipp_version, version)
+
+        if self.tls_upgrade and not self.tls and cache.get(self._host_key, "tls"):
+            self._use_tls()
+
+    def _use_tls(self) -> None:
+        """Switch to IPP over TLS, remembering the host requires it."""
+        self.tls = True
+        self._printer_uri = URL(self._printer_uri).with_scheme("ipps").human_repr()
+
+        if self.host_cache is not None:
+            self.host_cache.set(self._host_key, "tls", True)  # noqa: FBT003
+
+    def _with_printer_uri(
+        self,
+        template: RequestTemplate,
+        printer_uri: str,
+    ) -> RequestTemplate:
+        """Return the template for the printer uri, if built for the one given."""
+        attributes = template.message.get("operation-attributes-tag", {})
+
+        if attributes.get("printer-uri") != printer_uri:
+            return template
+
+        return RequestTemplate(
+            {
+                **template.message,
+                "operation-attributes-tag": {
+                    **attributes,
+                    "printer-uri": self._printer_uri,
+                },
+            },
+        )
+
+    def template(
         self,
         operation: IppOperation,
         message: dict[str, Any],
-    ) -> dict[str, Any]:
-        """Send a request message to the server."""
-        message = self._message(operation, message)
-        response = await self._request(data=message)
+    ) -> RequestTemplate:
+        """Build a request template to be sent repeatedly to the server.
 
-        try:
-            parsed = parse_response(response)
-        except (structerror, Exception) as exc:  # disable=broad-except
-            raise IPPParseError from exc
+        The template may be passed in place of a message to execute() and
+        the other request methods, which then only encode a new request id.
+        """
+        self._apply_host_cache()
+
+        return RequestTemplate(self._message(operation, message))
 
-        if parsed["status-code"] == IppStatus.ERROR_VERSION_NOT_SUPPORTED:
+    def _raise_for_status(self, status_code: int) -> None:
+        """Raise for IPP status codes that are not successful."""
+        if status_code == IppStatus.ERROR_VERSION_NOT_SUPPORTED:
             raise IPPVersionNotSupportedError("IPP version not supported by server")
 
-        if parsed["status-code"] not in range(0x200):
+        if status_code not in range(0x200):
             raise IPPError(
                 "Unexpected printer status code",
-                {"status-code": parsed["status-code"]},
+                {"status-code": status_code},
+            )
+
+    async def _execute(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        parse: Callable[[bytes], _ResponseT],
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
+    ) -> _ResponseT:
+        """Send a request message to the server and parse the response.
+
+        A server not supporting the IPP version is sent the request again
+        with the next lower one, unless the message gives its own version.
+        Once the server answered, the version negotiated is kept for the
+        following requests, and in the host cache for other clients.
+
+        With tls_upgrade, a server requiring TLS by HTTP 426 is sent the
+        request again over TLS, which is likewise kept and cached.
+        """
+        # concurrent requests negotiate on their own, and only ever lower
+        # the version of the client to one the server answered to
+        self._apply_host_cache()
+        version = self.ipp_version
+
+        while True:
+            body = self._prepare(operation, message, version)
+
+            try:
+                response = await self._coalesce(
+                    operation,
+                    body,
+                    parse,
+                    request_timeout,
+                    long_poll=long_poll,
+                )
+                break
+            except IPPConnectionUpgradeRequired:
+                if not self.tls_upgrade or self.tls or not self._replayable(body):
+                    raise
+
+                printer_uri = self._printer_uri
+                self._use_tls()
+
+                if isinstance(message, RequestTemplate):
+                    message = self._with_printer_uri(message, printer_uri)
+            except IPPVersionNotSupportedError:
+                lower = next((v for v in PROTO_VERSIONS if v < version), None)
+
+                if (
+                    lower is None
+                    or not self._replayable(body)
+                    or isinstance(message, dict)
+                    and "version" in message
+                    or isinstance(message, IppRequest)
+                    and message.version is not None
+                ):
+                    raise
+
+                version = lower
+
+        self.ipp_version = min(self.ipp_version, version)
+
+        cache = self.host_cache
+        if cache is not None and version < (
+            cache.ipp_version(self._host_key) or DEFAULT_PROTO_VERSION
+        ):
+            cache.set_ipp_version(self._host_key, version)
+
+        return response
+
+    async def _coalesce(
+        self,
+        operation: IppOperation,
+        body: dict[str, Any] | RequestTemplate | bytes | AsyncIterator[bytes],
+        parse: Callable[[bytes], _ResponseT],
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
+    ) -> _ResponseT:
+        """Send a prepared request, sharing it with identical ones in flight.
+
+        Requests are identical when everything but the request id is the
+        same, including how the response is parsed and the credentials
+        they are sent with.
+        """
+        coalescer = self.coalescer
+
+        if (
+            coalescer is None
+            or operation not in coalescer.operations
+            or not self._replayable(body)
+        ):
+            return await self._send(
+                operation,
+                body,
+                parse,
+                request_timeout,
+                long_poll=long_poll,
+            )
+
+        if isinstance(body, dict):
+            body = encode_dict(body)
+        elif isinstance(body, RequestTemplate):
+            body = body.encode()
+
+        if isinstance(parse, partial):
+            parse_key: Any = (parse.func, repr(parse.args), repr(parse.keywords))
+        else:
+            parse_key = parse
+
+        key = (
+            self._host_key,
+            self.base_path,
+            self.tls,
+            tuple(self._headers().items()),
+            parse_key,
+            bytes(body[:4]) + bytes(body[8:]),  # type: ignore[index]
+        )
+
+        result: _ResponseT = await coalescer.run(
+            key,
+            partial(
+                self._send,
+                operation,
+                body,
+                parse,
+                request_timeout,
+                long_poll=long_poll,
+            ),
+        )
+
+        return result
+
+    @staticmethod
+    def _replayable(
+        body: dict[str, Any] | RequestTemplate | bytes | AsyncIterator[bytes],
+    ) -> bool:
+        """Return whether a prepared request can be sent more than once."""
+        if isinstance(body, dict):
+            return isinstance(body.get("data", b""), bytes)
+
+        return isinstance(body, (bytes, RequestTemplate))
+
+    async def _send(
+        self,
+        operation: IppOperation,
+        body: dict[str, Any] | RequestTemplate | bytes | AsyncIterator[bytes],
+        parse: Callable[[bytes], _ResponseT],
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
+    ) -> _ResponseT:
+        """Send a prepared request, retrying as given by the retry policy.
+
+        Streamed documents are never retried, as a stream is sent once, nor
+        are long polls, which the caller polls again anyway.
+        """
+        policy = self.retry_policy
+
+        if (
+            policy is None
+            or long_poll
+            or operation not in policy.operations
+            or not self._replayable(body)
+        ):
+            return await self._execute_once(
+                body,
+                parse,
+                request_timeout,
+                long_poll=long_poll,
             )
 
+        delays = policy.delays()
+        tries = 1
+
+        while True:
+            try:
+                return await self._execute_once(body, parse, request_timeout)
+            except IPPError as exc:
+                delay = policy.retry_delay(exc, next(delays))
+
+                if delay is None or tries >= policy.max_tries:
+                    raise
+
+            tries += 1
+            await asyncio.sleep(delay)
+
+    async def _execute_once(
+        self,
+        body: dict[str, Any] | RequestTemplate | bytes | AsyncIterator[bytes],
+        parse: Callable[[bytes], _ResponseT],
+        request_timeout: float | None = None,
+        *,
+        long_poll: bool = False,
+    ) -> _ResponseT:
+        """Send a prepared request to the server and parse the response.
+
+        Responses larger than offload_threshold bytes are parsed in the
+        executor, the default one of the loop if none is given, so parsing
+        them does not block the loop.
+        """
+        response = await self._request(
+            data=body,
+            request_timeout=request_timeout,
+            long_poll=long_poll,
+        )
+        threshold = self.offload_threshold
+
+        try:
+            if threshold is None or len(response) <= threshold:
+                parsed = parse(response)
+            else:
+                # a lazy view would only defer decoding back to the loop
+                offloaded: Callable[[bytes], Any] = (
+                    parse_response if parse is LazyResponse else parse
+                )
+                parsed = await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    offloaded,
+                    response,
+                )
+        except (structerror, Exception) as exc:  # disable=broad-except
+            raise IPPParseError from exc
+
+        self._raise_for_status(parsed["status-code"])
+
         return parsed
 
-    async def raw(self, operation: IppOperation, message: dict[str, Any]) -> bytes:
+    async def execute(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        *,
+        attributes: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        epoch_dates: bool = False,
+    ) -> dict[str, Any]:
+        """Send a request message to the server.
+
+        The message is a dict, which is merged into the default operation
+        attributes, a RequestTemplate or an IppRequest, which have to be for
+        the operation given.
+
+        The document in the "data" of the message, for operations such as
+        PRINT_JOB and SEND_DOCUMENT, may be bytes, a memoryview, a file
+        path, a file object or an async iterable of bytes. Anything other
+        than bytes is streamed as the request body, see encode_stream().
+
+        The attributes allow-list and exclude deny-list limit which
+        attributes of the response are decoded, and epoch_dates returns
+        dateTime values as seconds since the epoch, see parse().
+        """
+        if attributes is None and exclude is None and not epoch_dates:
+            return await self._execute(operation, message, parse_response)
+
+        # the response may be parsed more than once, and identical requests
+        # must parse it the same way to be coalesced
+        return await self._execute(
+            operation,
+            message,
+            partial(
+                parse_response,
+                attributes=None if attributes is None else tuple(sorted(attributes)),
+                exclude=None if exclude is None else tuple(sorted(exclude)),
+                epoch_dates=epoch_dates,
+            ),
+        )
+
+    async def stream(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Send a request message and yield attribute groups as they arrive.
+
+        Each group is yielded as a tuple of group key, such as "jobs" or
+        "printers", and its attributes, as soon as it is complete.
+        """
+        body = self._prepare(operation, message)
+        response = await self._response(data=body)
+        stream_parser = StreamParser()
+
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                try:
+                    groups = stream_parser.feed(chunk)
+                except (structerror, Exception) as exc:  # disable=broad-except
+                    raise IPPParseError from exc
+
+                if stream_parser.status_code is not None:
+                    self._raise_for_status(stream_parser.status_code)
+
+                for group in groups:
+                    yield group
+
+            stream_parser.close()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise IPPConnectionError(
+                "Error occurred while communicating with IPP server.",
+            ) from exc
+        finally:
+            response.release()
+
+    async def download(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        destination: str | os.PathLike[str] | Any,
+        chunk_size: int = 65536,
+    ) -> dict[str, Any]:
+        """Send a request message and stream the returned document.
+
+        The destination is a file path, an object with a write method or
+        a callback, the latter two may also be coroutines. The document is
+        written in chunks as it arrives, so memory use does not depend on
+        its size. The attribute groups are returned like from execute().
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            loop = asyncio.get_running_loop()
+
+            with open(destination, "wb") as file:  # noqa: PTH123, ASYNC230
+
+                def write_file(data: bytes) -> asyncio.Future[int]:
+                    return loop.run_in_executor(None, file.write, data)
+
+                return await self._download(operation, message, write_file, chunk_size)
+
+        write = getattr(destination, "write", destination)
+
+        return await self._download(operation, message, write, chunk_size)
+
+    async def _download(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+        write: Callable[[bytes], Any],
+        chunk_size: int,
+    ) -> dict[str, Any]:
+        """Stream the document of a response to a write callback."""
+        body = self._prepare(operation, message)
+        response = await self._response(data=body)
+        stream_parser = StreamParser(contains_data=True)
+        groups: list[tuple[str, dict[str, Any]]] = []
+
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                try:
+                    groups.extend(stream_parser.feed(chunk))
+                except (structerror, Exception) as exc:  # disable=broad-except
+                    raise IPPParseError from exc
+
+                if stream_parser.status_code is not None:
+                    self._raise_for_status(stream_parser.status_code)
+
+                for data in stream_parser.take_data():
+                    if inspect.isawaitable(result := write(data)):
+                        await result
+
+            stream_parser.close()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise IPPConnectionError(
+                "Error occurred while communicating with IPP server.",
+            ) from exc
+        finally:
+            response.release()
+
+        return build_response(stream_parser, groups)
+
+    async def raw(
+        self,
+        operation: IppOperation,
+        message: dict[str, Any] | RequestTemplate | IppRequest,
+    ) -> bytes:
         """Send a request message to the server and return raw response."""
-        message = self._message(operation, message)
+        body = self._prepare(operation, message)
 
-        return await self._request(data=message)
+        return await self._request(data=body)
 
     async def close(self) -> None:
         """Close open client session."""
         if self.session and self._close_session:
             await self.session.close()
+        elif self.session_manager is not None and self._release_session:
+            self.session = None
+            self._release_session = False
+            await self.session_manager.release()
 
     async def printer(self) -> Printer:
-        """Get printer information from server."""
-        response_data = await self.execute(
+        """Get printer information from server.
+
+        With an attribute cache, only the attributes which are stale are
+        requested, see AttributeCache.
+
+        With delta_polling, only the change times and up-time are requested
+        first, and the printer is returned as before, with its up-time
+        updated, unless its state or configuration changed, or it rebooted.
+        Marker levels are not followed until then. Printers lacking both
+        change times are polled in full.
+        """
+        change_times = None
+
+        if self.delta_polling and self._delta_supported:
+            unchanged, change_times = await self._unchanged()
+
+            if unchanged and self._printer is not None:
+                return self._printer
+
+        printer = await self._poll_printer()
+
+        # only once the printer is up to date, so a failed poll is repeated
+        self._change_times = change_times
+
+        return printer
+
+    async def _poll_printer(self) -> Printer:
+        """Get all printer information from server."""
+        if self.attribute_cache is not None:
+            return self._update_printer(
+                await self.attribute_cache.printer_attributes(self),
+            )
+
+        self._apply_host_cache()
+
+        if self._printer_template is None or self._printer_template[0] != (
+            self._printer_uri,
+            self.ipp_version,
+        ):
+            self._printer_template = (
+                (self._printer_uri, self.ipp_version),
+                self.template(
+                    IppOperation.GET_PRINTER_ATTRIBUTES,
+                    {
+                        "operation-attributes-tag": {
+                            "requested-attributes": DEFAULT_PRINTER_ATTRIBUTES,
+                        },
+                    },
+                ),
+            )
+
+        response_data = await self._execute(
             IppOperation.GET_PRINTER_ATTRIBUTES,
-            {
-                "operation-attributes-tag": {
-                    "requested-attributes": DEFAULT_PRINTER_ATTRIBUTES,
-                },
-            },
+            self._printer_template[1],
+            LazyResponse,
         )
 
-        parsed: dict[str, Any] = next(iter(response_data["printers"] or []), {})
+        return self._update_printer(next(iter(response_data["printers"] or []), {}))
+
+    async def _unchanged(self) -> tuple[bool, tuple[Any, Any] | None]:
+        """Return whether the printer did not change since the last poll.
+
+        The change times polled are returned too, None if the printer has
+        neither of them.
+        """
+        self._apply_host_cache()
+
+        if self._change_template is None or self._change_template[0] != (
+            self._printer_uri,
+            self.ipp_version,
+        ):
+            self._change_template = (
+                (self._printer_uri, self.ipp_version),
+                self.template(
+                    IppOperation.GET_PRINTER_ATTRIBUTES,
+                    {
+                        "operation-attributes-tag": {
+                            "requested-attributes": CHANGE_PRINTER_ATTRIBUTES,
+                        },
+                    },
+                ),
+            )
+
+        response_data = await self._execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            self._change_template[1],
+            parse_response,
+        )
+
+        parsed: Mapping[str, Any] = next(iter(response_data["printers"]), {})
+        change_times = (
+            parsed.get("printer-state-change-time"),
+            parsed.get("printer-config-change-time"),
+        )
+
+        if change_times == (None, None):
+            self._delta_supported = False
+            return False, None
+
+        printer = self._printer
+
+        if (
+            printer is None
+            or change_times != self._change_times
+            or parsed.get("printer-up-time", 0) < printer.info.uptime
+        ):
+            return False, change_times
 
+        printer.info.uptime = parsed.get("printer-up-time", printer.info.uptime)
+
+        return True, change_times
+
+    def _update_printer(self, parsed: Mapping[str, Any]) -> Printer:
+        """Update the printer information from the printer attributes."""
         try:
             if self._printer is None:
                 self._printer = Printer.from_dict(parsed)
@@ -242,6 +995,213 @@ class IPP:
 
         return self._printer
 
+    async def create_subscription(
+        self,
+        events: Iterable[str] = DEFAULT_PRINTER_EVENTS,
+        *,
+        job_id: int | None = None,
+        lease_duration: int = DEFAULT_LEASE_DURATION,
+        recipient_uri: str | None = None,
+        time_interval: int | None = None,
+    ) -> dict[str, Any]:
+        """Create a printer subscription, or a job subscription for a job id.
+
+        Events are pulled with get_notifications(), unless a recipient uri
+        is given for the printer to push them to. Returns the attributes
+        of the subscription, with its notify-subscription-id and, for
+        printer subscriptions, the notify-lease-duration granted.
+        """
+        subscription: dict[str, Any] = (
+            {"notify-recipient-uri": recipient_uri}
+            if recipient_uri
+            else {"notify-pull-method": "ippget"}
+        )
+        subscription["notify-events"] = list(events)
+
+        if job_id is None:
+            operation = IppOperation.CREATE_PRINTER_SUBSCRIPTIONS
+            subscription["notify-lease-duration"] = lease_duration
+        else:
+            operation = IppOperation.CREATE_JOB_SUBSCRIPTIONS
+            subscription["notify-job-id"] = job_id
+
+        if time_interval is not None:
+            subscription["notify-time-interval"] = time_interval
+
+        response = await self.execute(
+            operation,
+            {"subscription-attributes-tag": subscription},
+        )
+
+        if "notify-subscription-id" not in next(iter(response["subscriptions"]), {}):
+            raise IPPError(
+                "Subscription was not created",
+                {"status-code": response["status-code"]},
+            )
+
+        created: dict[str, Any] = response["subscriptions"][0]
+
+        return created
+
+    async def renew_subscription(
+        self,
+        subscription_id: int,
+        lease_duration: int = DEFAULT_LEASE_DURATION,
+    ) -> int:
+        """Renew a printer subscription and return the lease duration granted."""
+        response = await self.execute(
+            IppOperation.RENEW_SUBSCRIPTION,
+            {
+                "operation-attributes-tag": {
+                    "notify-subscription-id": subscription_id,
+                },
+                "subscription-attributes-tag": {
+                    "notify-lease-duration": lease_duration,
+                },
+            },
+        )
+
+        subscription: dict[str, Any] = next(iter(response["subscriptions"]), {})
+        granted: int = subscription.get("notify-lease-duration", lease_duration)
+
+        return granted
+
+    async def cancel_subscription(self, subscription_id: int) -> None:
+        """Cancel a subscription."""
+        await self.execute(
+            IppOperation.CANCEL_SUBSCRIPTION,
+            {
+                "operation-attributes-tag": {
+                    "notify-subscription-id": subscription_id,
+                },
+            },
+        )
+
+    async def get_notifications(
+        self,
+        subscription_ids: Iterable[int],
+        sequence_numbers: Iterable[int] | None = None,
+        *,
+        wait: bool = False,
+        request_timeout: float | None = None,
+    ) -> dict[str, Any]:
+        """Get the pending event notifications of subscriptions.
+
+        With wait set, the printer may hold the request until an event
+        occurs, so it should be given a request_timeout longer than the
+        default one. The events are returned in the "events" groups, and
+        the seconds to wait before asking again in the notify-get-interval
+        operation attribute.
+        """
+        operation_attributes: dict[str, Any] = {
+            "notify-subscription-ids": list(subscription_ids),
+        }
+
+        if sequence_numbers is not None:
+            operation_attributes["notify-sequence-numbers"] = list(sequence_numbers)
+
+        operation_attributes["notify-wait"] = wait
+
+        return await self._execute(
+            IppOperation.GET_NOTIFICATIONS,
+            {"operation-attributes-tag": operation_attributes},
+            parse_response,
+            request_timeout,
+            long_poll=wait,
+        )
+
+    # pylint: disable=R0912
+    async def events(  # noqa: PLR0912, PLR0913
+        self,
+        events: Iterable[str] = DEFAULT_PRINTER_EVENTS,
+        *,
+        job_id: int | None = None,
+        lease_duration: int = DEFAULT_LEASE_DURATION,
+        renew_margin: float = 60.0,
+        wait: bool = True,
+        wait_timeout: float = 300.0,
+    ) -> AsyncIterator[Event]:
+        """Subscribe to events and yield them as they occur.
+
+        The events are long polled with get_notifications(), waiting up to
+        wait_timeout for the printer to respond, and otherwise as often as
+        the printer asks for with notify-get-interval. Printer
+        subscriptions are renewed renew_margin seconds before their lease
+        expires, and created again if the printer loses them. The
+        subscription is cancelled when the iteration ends, and for job
+        subscriptions the iteration ends once the job is complete.
+        """
+        loop = asyncio.get_running_loop()
+        events = list(events)
+        subscription_id: int | None = None
+        renew_at: float | None = None
+        sequence_number = 1
+
+        try:
+            while True:
+                if subscription_id is None:
+                    subscription = await self.create_subscription(
+                        events,
+                        job_id=job_id,
+                        lease_duration=lease_duration,
+                    )
+                    subscription_id = subscription["notify-subscription-id"]
+                    sequence_number = 1
+                    lease = subscription.get("notify-lease-duration", 0)
+                    # a lease of zero never expires, nor do job subscriptions
+                    renew_at = loop.time() + lease - renew_margin if lease else None
+                elif renew_at is not None and loop.time() >= renew_at:
+                    lease = await self.renew_subscription(
+                        subscription_id,
+                        lease_duration,
+                    )
+                    renew_at = loop.time() + lease - renew_margin if lease else None
+
+                try:
+                    response = await self.get_notifications(
+                        [subscription_id],
+                        [sequence_number],
+                        wait=wait,
+                        request_timeout=wait_timeout if wait else None,
+                    )
+                except IPPConnectionError as exc:
+                    if isinstance(exc.__cause__, asyncio.TimeoutError):
+                        continue  # the printer held the request for too long
+                    raise
+                except IPPError as exc:
+                    if exc.args[1:] and exc.args[1].get("status-code") in (
+                        IppStatus.ERROR_NOT_FOUND,
+                        IppStatus.ERROR_GONE,
+                    ):
+                        subscription_id = None  # lost, subscribe again
+                        continue
+                    raise
+
+                for data in response["events"]:
+                    event = Event.from_dict(data)
+
+                    if event.subscription_id == subscription_id:
+                        sequence_number = max(
+                            sequence_number,
+                            event.sequence_number + 1,
+                        )
+                        yield event
+
+                if response["status-code"] == IppStatus.OK_EVENTS_COMPLETE:
+                    return
+
+                interval = response["operation-attributes"].get("notify-get-interval")
+
+                if not response["events"] and interval:
+                    if renew_at is not None:
+                        interval = min(interval, max(renew_at - loop.time(), 0))
+
+                    await asyncio.sleep(interval)
+        finally:
+            if subscription_id is not None:
+                with suppress(IPPError):
+                    await self.cancel_subscription(subscription_id)
+
     async def __aenter__(self) -> IPP:   # noqa: PYI034
         """Async enter."""
         return self
@@ -0,0 +1,142 @@
+"""Lazy Response View for IPP."""
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from .enums import IppTag
+from .parser import GROUP_KEYS, decode_attribute, skip_attribute
+
+_HEADER = struct.Struct(">bbhi")
+_SHORT = struct.Struct(">h")
+
+_END = IppTag.END.value
+_BEGIN_COLLECTION = IppTag.BEGIN_COLLECTION.value
+
+
+class AttributeView(Mapping[str, Any]):
+    """Read-only view over an attribute group of a raw IPP response.
+
+    Only the offsets of each attribute are known up front, values are
+    decoded when their name is first accessed and memoized afterwards.
+    """
+
+    __slots__ = ("_data", "_index", "_values")
+
+    def __init__(self, data: memoryview, index: dict[str, list[int]]) -> None:
+        """Initialize the view."""
+        self._data = data
+        self._index = index
+        self._values: dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        """Return the decoded value of an attribute."""
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        offsets = self._index[name]
+        values = [decode_attribute(self._data, offset, name)[2] for offset in offsets]
+        value = values[0] if len(values) == 1 else values
+
+        self._values[name] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the attribute names."""
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        """Return the number of attributes."""
+        return len(self._index)
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether the group holds an attribute, without decoding it."""
+        return name in self._index
+
+    def __repr__(self) -> str:
+        """Return representation of the view."""
+        return f"{type(self).__name__}({list(self._index)!r})"
+
+
+class LazyResponse(Mapping[str, Any]):
+    """Read-only view over a raw IPP response.
+
+    The response is indexed in a single pass over the length fields of a
+    memoryview, without copying or decoding any values. The view has the
+    same keys as the result of parse(), with each attribute group exposed
+    as an AttributeView.
+    """
+
+    __slots__ = ("_data", "_response")
+
+    def __init__(
+        self,
+        raw_data: bytes,
+        contains_data: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Index the raw IPP response."""
+        self._data = data = memoryview(raw_data)
+
+        groups: dict[str, list[AttributeView]] = {
+            "operation-attributes": [],
+            "unsupported-attributes": [],
+            "jobs": [],
+            "printers": [],
+            "subscriptions": [],
+            "events": [],
+        }
+        major, minor, status_code, request_id = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+
+        attribute_key = ""
+        previous_attribute_name = ""
+        index: dict[str, list[int]] = {}
+
+        while (tag := data[offset]) != _END:
+            if (group_key := GROUP_KEYS.get(tag)) is not None:
+                if index and attribute_key:
+                    groups[attribute_key].append(AttributeView(data, index))
+                    index = {}
+
+                attribute_key = group_key
+                offset += 1
+                continue
+
+            name_end = offset + 3 + _SHORT.unpack_from(data, offset + 1)[0]
+
+            if name_end > offset + 3:
+                previous_attribute_name = str(data[offset + 3 : name_end], "utf-8")
+                index[previous_attribute_name] = [offset]
+            elif previous_attribute_name:
+                index[previous_attribute_name].append(offset)
+
+            if tag == _BEGIN_COLLECTION:
+                offset = skip_attribute(data, offset)
+            else:
+                offset = name_end + 2 + _SHORT.unpack_from(data, name_end)[0]
+
+        groups[attribute_key].append(AttributeView(data, index))
+
+        self._response: dict[str, Any] = {
+            "version": (major, minor),
+            "status-code": status_code,
+            "request-id": request_id,
+            **groups,
+            "operation-attributes": groups["operation-attributes"][0],
+            "data": data[offset + 1 :] if contains_data else b"",
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a top level item of the response."""
+        return self._response[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the top level keys of the response."""
+        return iter(self._response)
+
+    def __len__(self) -> int:
+        """Return the number of top level keys."""
+        return len(self._response)
@@ -4,12 +4,15 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from yarl import URL
 
 from .parser import parse_ieee1284_device_id, parse_make_and_model
 
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
 PRINTER_STATES = {3: "idle", 4: "printing", 5: "stopped"}
 
 
@@ -32,7 +35,7 @@ class Info:
     more_info: str | None = None
 
     @staticmethod
-    def from_dict(data: dict[str, Any]) -> Info:
+    def from_dict(data: Mapping[str, Any]) -> Info:
         """Return Info object from IPP response."""
         cmd = None
         name = "IPP Printer"
@@ -124,7 +127,7 @@ class State:
     message: str | None
 
     @staticmethod
-    def from_dict(data: dict[str, Any]) -> State:
+    def from_dict(data: Mapping[str, Any]) -> State:
         """Return State object from IPP response."""
         state = data.get("printer-state", 0)
 
@@ -158,7 +161,7 @@ class Printer:
             "booted_at": self.booted_at,
         }
 
-    def update_from_dict(self, data: dict[str, Any]) -> Printer:
+    def update_from_dict(self, data: Mapping[str, Any]) -> Printer:
         """Return updated Printer object from IPP response data."""
         last_uptime = self.info.uptime
 
@@ -174,7 +177,7 @@ class Printer:
 
 
     @staticmethod
-    def from_dict(data: dict[str, Any]) -> Printer:
+    def from_dict(data: Mapping[str, Any]) -> Printer:
         """Return Printer object from IPP response data."""
         info = Info.from_dict(data)
 
@@ -188,7 +191,7 @@ class Printer:
 
     @staticmethod
     def merge_marker_data(  # noqa: PLR0912, C901
-        data: dict[str, Any],
+        data: Mapping[str, Any],
     ) -> list[Marker]:
         """Return Marker data from IPP response."""
         marker_names = []
@@ -268,7 +271,7 @@ class Printer:
         return markers
 
     @staticmethod
-    def merge_uri_data(data: dict[str, Any]) -> list[Uri]:  # noqa: PLR0912
+    def merge_uri_data(data: Mapping[str, Any]) -> list[Uri]:  # noqa: PLR0912
         """Return URI data from IPP response."""
         _uris: list[str] = []
         auth: list[str | None] = []
@@ -313,6 +316,36 @@ class Printer:
         ]
 
 
+@dataclass
+class Event:
+    """Object holding an IPP event notification."""
+
+    subscription_id: int
+    sequence_number: int
+    event: str
+    text: str | None
+    printer_state: str | None
+    job_id: int | None
+    job_state: int | None
+    attributes: dict[str, Any]
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> Event:
+        """Return Event object from IPP event notification attributes."""
+        state = data.get("printer-state")
+
+        return Event(
+            subscription_id=data.get("notify-subscription-id", 0),
+            sequence_number=data.get("notify-sequence-number", 0),
+            event=data.get("notify-subscribed-event", ""),
+            text=data.get("notify-text"),
+            printer_state=None if state is None else PRINTER_STATES.get(state, state),
+            job_id=data.get("notify-job-id"),
+            job_state=data.get("job-state"),
+            attributes=dict(data),
+        )
+
+
 def _utcnow() -> datetime:
     """Return the current date and time in UTC."""
     return datetime.now(tz=timezone.utc)
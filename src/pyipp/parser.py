@@ -4,13 +4,41 @@ from __future__ import annotations
 import logging
 import struct
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
-from .enums import ATTRIBUTE_ENUM_MAP, IppTag
+from .enums import ATTRIBUTE_ENUM_VALUES, IppTag
 from .exceptions import IPPParseError
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 _LOGGER = logging.getLogger(__name__)
 
+_SIGNED_BYTE = struct.Struct(">b")
+_SHORT = struct.Struct(">h")
+_INTEGER = struct.Struct(">i")
+_BOOLEAN = struct.Struct(">?")
+_RESOLUTION = struct.Struct(">iib")
+_DATE = struct.Struct(">hbbbbbbcbb")
+_HEADER = struct.Struct(">bbhi")
+
+_END = IppTag.END.value
+_BEGIN_COLLECTION = IppTag.BEGIN_COLLECTION.value
+_END_COLLECTION = IppTag.END_COLLECTION.value
+_MEMBER_NAME = IppTag.MEMBER_NAME.value
+
+_TIMEZONES: dict[tuple[bytes, int, int], timezone] = {}
+_EPOCH_DAYS: dict[tuple[int, int, int], int] = {}
+
+GROUP_KEYS = {
+    IppTag.OPERATION.value: "operation-attributes",
+    IppTag.JOB.value: "jobs",
+    IppTag.PRINTER.value: "printers",
+    IppTag.UNSUPPORTED_GROUP.value: "unsupported-attributes",
+    IppTag.SUBSCRIPTION.value: "subscriptions",
+    IppTag.EVENT_NOTIFICATION.value: "events",
+}
+
 
 def parse_ieee1284_device_id(device_id: str) -> dict[str, str]:
     """Parse IEEE 1284 device id for common device info."""
@@ -36,33 +64,267 @@ def parse_ieee1284_device_id(device_id: str) -> dict[str, str]:
     return device_info
 
 
-def parse_collection(data: bytes, offset: int) -> tuple[dict[str, Any], int]:
+def _decode_integer(data: bytes, offset: int, _length: int, _name: str) -> int:
+    """Decode an integer value."""
+    return _INTEGER.unpack_from(data, offset)[0]  # type: ignore[no-any-return]
+
+
+def _decode_enum(data: bytes, offset: int, _length: int, name: str) -> Any:
+    """Decode an enum value, resolving it against the known attribute enums.
+
+    Values unknown to the enum, such as vendor extensions, are kept as int.
+    """
+    value = _INTEGER.unpack_from(data, offset)[0]
+
+    if (members := ATTRIBUTE_ENUM_VALUES.get(name)) is not None:
+        return members.get(value, value)
+
+    return value
+
+
+def _decode_boolean(data: bytes, offset: int, _length: int, _name: str) -> bool:
+    """Decode a boolean value."""
+    return _BOOLEAN.unpack_from(data, offset)[0]  # type: ignore[no-any-return]
+
+
+def _date_timezone(tz_dir: bytes, tz_hour: int, tz_minute: int) -> timezone:
+    """Return the shared timezone object for an UTC offset."""
+    try:
+        return _TIMEZONES[(tz_dir, tz_hour, tz_minute)]
+    except KeyError:
+        pass
+
+    tzinfo = timezone(
+        {b"+": 1, b"-": -1}[tz_dir] * timedelta(hours=tz_hour, minutes=tz_minute),
+    )
+    _TIMEZONES[(tz_dir, tz_hour, tz_minute)] = tzinfo
+
+    return tzinfo
+
+
+def _decode_date(data: bytes, offset: int, length: int, _name: str) -> datetime:
+    """Decode a RFC 2579 DateAndTime value."""
+    if length != 11:
+        raise IPPParseError(f"Invalid DATE size {length}")  # noqa: EM102
+
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        decisecond,
+        tz_dir,
+        tz_hour,
+        tz_minute,
+    ) = _DATE.unpack_from(data, offset)
+
+    return datetime(
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        decisecond * 100_000,
+        _date_timezone(tz_dir, tz_hour, tz_minute),
+    )
+
+
+def _decode_date_epoch(data: bytes, offset: int, length: int, _name: str) -> float:
+    """Decode a RFC 2579 DateAndTime value as seconds since the epoch."""
+    if length != 11:
+        raise IPPParseError(f"Invalid DATE size {length}")  # noqa: EM102
+
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        decisecond,
+        tz_dir,
+        tz_hour,
+        tz_minute,
+    ) = _DATE.unpack_from(data, offset)
+
+    try:
+        midnight = _EPOCH_DAYS[(year, month, day)]
+    except KeyError:
+        midnight = _EPOCH_DAYS[(year, month, day)] = int(
+            datetime(year, month, day, tzinfo=timezone.utc).timestamp(),
+        )
+
+    utc_offset = tz_hour * 3600 + tz_minute * 60
+    if tz_dir == b"-":
+        utc_offset = -utc_offset
+
+    seconds: float = (
+        midnight + hour * 3600 + minute * 60 + second - utc_offset + decisecond / 10
+    )
+
+    return seconds
+
+
+def _decode_reserved_string(
+    data: bytes,
+    offset: int,
+    length: int,
+    _name: str,
+) -> str | None:
+    """Decode a reserved string value."""
+    if length > 0:
+        return str(data[offset : offset + length], "utf-8")
+
+    return None
+
+
+def _decode_range(data: bytes, offset: int, length: int, _name: str) -> list[int]:
+    """Decode a rangeOfInteger value."""
+    return [
+        _INTEGER.unpack_from(data, offset + i * 4)[0] for i in range(length // 4)
+    ]
+
+
+def _decode_resolution(
+    data: bytes,
+    offset: int,
+    _length: int,
+    _name: str,
+) -> tuple[int, int, int]:
+    """Decode a resolution value."""
+    return _RESOLUTION.unpack_from(data, offset)
+
+
+def _decode_string_with_language(
+    data: bytes,
+    offset: int,
+    _length: int,
+    _name: str,
+) -> str:
+    """Decode the text of a textWithLanguage or nameWithLanguage value."""
+    offset += 2 + _SHORT.unpack_from(data, offset)[0]
+    text_length = _SHORT.unpack_from(data, offset)[0]
+    offset += 2
+
+    return str(data[offset : offset + text_length], "utf-8")
+
+
+def _decode_end_collection(
+    _data: bytes,
+    _offset: int,
+    _length: int,
+    _name: str,
+) -> None:
+    """Decode the end of collection marker."""
+    return
+
+
+def _decode_string(data: bytes, offset: int, length: int, _name: str) -> str:
+    """Decode any other value as a string."""
+    return str(data[offset : offset + length], "utf-8", "ignore")
+
+
+VALUE_DECODERS: dict[int, Callable[[bytes, int, int, str], Any]] = {
+    IppTag.INTEGER.value: _decode_integer,
+    IppTag.ENUM.value: _decode_enum,
+    IppTag.BOOLEAN.value: _decode_boolean,
+    IppTag.DATE.value: _decode_date,
+    IppTag.RESERVED_STRING.value: _decode_reserved_string,
+    IppTag.RANGE.value: _decode_range,
+    IppTag.RESOLUTION.value: _decode_resolution,
+    IppTag.TEXT_LANG.value: _decode_string_with_language,
+    IppTag.NAME_LANG.value: _decode_string_with_language,
+    IppTag.END_COLLECTION.value: _decode_end_collection,
+}
+
+EPOCH_VALUE_DECODERS = {
+    **VALUE_DECODERS,
+    IppTag.DATE.value: _decode_date_epoch,
+}
+
+
+def decode_attribute(
+    data: bytes,
+    offset: int,
+    prev_attr_name: str = "",
+    decoders: dict[int, Callable[[bytes, int, int, str], Any]] = VALUE_DECODERS,
+) -> tuple[int, str, Any, int]:
+    """Decode attribute from IPP data.
+
+    Returns a tuple of tag, name, value and the offset of the next attribute.
+    """
+    tag = data[offset]
+    name_length = _SHORT.unpack_from(data, offset + 1)[0]
+    offset += 3
+
+    name_end = offset + name_length
+    name = str(data[offset:name_end], "utf-8") if name_length else ""
+
+    value_length = _SHORT.unpack_from(data, name_end)[0]
+    offset = name_end + 2
+
+    if tag == _BEGIN_COLLECTION:
+        value, offset = parse_collection(data, offset + value_length, decoders)
+        return tag, name, value, offset
+
+    value = decoders.get(tag, _decode_string)(
+        data,
+        offset,
+        value_length,
+        name or prev_attr_name,
+    )
+
+    return tag, name, value, offset + value_length
+
+
+def skip_attribute(data: bytes, offset: int) -> int:
+    """Return the offset of the next attribute without decoding this one.
+
+    Only the length fields are read, nested collections are skipped whole.
+    """
+    depth = 0
+
+    while True:
+        tag = data[offset]
+        offset += 3 + _SHORT.unpack_from(data, offset + 1)[0]
+        offset += 2 + _SHORT.unpack_from(data, offset)[0]
+
+        if tag == _BEGIN_COLLECTION:
+            depth += 1
+        elif tag == _END_COLLECTION:
+            depth -= 1
+
+        if depth <= 0:
+            return offset
+
+
+def parse_collection(
+    data: bytes,
+    offset: int,
+    decoders: dict[int, Callable[[bytes, int, int, str], Any]] = VALUE_DECODERS,
+) -> tuple[dict[str, Any], int]:
     """Parse member attributes from IPP collection."""
     collection_data: dict[str, Any] = {}
     member_name: str = ""
 
-    _LOGGER.debug("#BeginCollectionOffset: %s", offset)
-
-    while struct.unpack_from("b", data, offset)[0] != IppTag.END_COLLECTION.value:
-        attribute, next_attr_offset = parse_attribute(data, offset, member_name)
+    while data[offset] != _END_COLLECTION:
+        tag, _, value, offset = decode_attribute(data, offset, member_name, decoders)
 
-        if attribute["tag"] == IppTag.MEMBER_NAME.value:
-            member_name = attribute["value"]
+        if tag == _MEMBER_NAME:
+            member_name = value
         elif member_name:
-            collection_data[member_name] = attribute["value"]
-
-        offset = next_attr_offset
-
-    _LOGGER.debug("#EndCollectionOffset: %s", offset)
+            collection_data[member_name] = value
 
     # skip over end of collection marker
-    _, next_attr_offset = parse_attribute(data, offset)
+    _, _, _, offset = decode_attribute(data, offset)
 
-    return collection_data, next_attr_offset
+    return collection_data, offset
 
 
-# pylint: disable=R0912,R0915
-def parse_attribute(  # noqa: PLR0912, PLR0915
+def parse_attribute(
     data: bytes,
     offset: int,
     prev_attr_name: str = "",
@@ -77,144 +339,51 @@ def parse_attribute(  # noqa: PLR0912, PLR0915
     """
     _LOGGER.debug("Parsing Attribute at offset %s", offset)
 
-    attribute = {"tag": struct.unpack_from(">b", data, offset)[0]}
-    offset += 1
-
-    attribute["name-length"] = struct.unpack_from(">h", data, offset)[0]
-    offset += 2
+    tag, name, value, next_offset = decode_attribute(data, offset, prev_attr_name)
 
-    offset_length = offset + attribute["name-length"]
-    attribute["name"] = data[offset:offset_length].decode("utf-8")
-    offset += attribute["name-length"]
-
-    resolved_attr_name = attribute["name"] or prev_attr_name
-
-    if attribute["name"]:
-        _LOGGER.debug(
-            "Attribute Name: %s (%s)", attribute["name"], hex(attribute["tag"]),
-        )
-    else:
-        _LOGGER.debug("Attribute Tag: %s", hex(attribute["tag"]))
+    attribute: dict[str, Any] = {"tag": _SIGNED_BYTE.unpack_from(data, offset)[0]}
+    attribute["name-length"] = _SHORT.unpack_from(data, offset + 1)[0]
+    attribute["name"] = name
 
-    attribute["value-length"] = struct.unpack_from(">h", data, offset)[0]
+    offset += 3 + attribute["name-length"]
+    attribute["value-length"] = _SHORT.unpack_from(data, offset)[0]
     offset += 2
 
-    _LOGGER.debug("Attribute Value Offset: %s", offset)
-    _LOGGER.debug("Attribute Value Length: %s", attribute["value-length"])
-
-    if attribute["tag"] in (IppTag.ENUM.value, IppTag.INTEGER.value):
-        attribute["value"] = struct.unpack_from(">i", data, offset)[0]
-
-        if (
-            attribute["tag"] == IppTag.ENUM.value
-            and resolved_attr_name in ATTRIBUTE_ENUM_MAP
-        ):
-            enum_class = ATTRIBUTE_ENUM_MAP[resolved_attr_name]
-            attribute["value"] = enum_class(attribute["value"])
-
-        offset += 4
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.BOOLEAN.value:
-        attribute["value"] = struct.unpack_from(">?", data, offset)[0]
-        offset += 1
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.DATE.value:
-        if attribute["value-length"] != 11:
-            raise IPPParseError(
-                f'Invalid DATE size {attribute["value-length"]}',  # noqa: EM102
-            )
-
-        raw_date = dict(
-            zip(
-                (
-                    "year",
-                    "month",
-                    "day",
-                    "hour",
-                    "minute",
-                    "second",
-                    "decisecond",
-                    "tz_dir",
-                    "tz_hour",
-                    "tz_minute",
-                ),
-                struct.unpack_from(">hbbbbbbcbb", data, offset),
-            ),
-        )
-        raw_date["microsecond"] = raw_date.pop("decisecond") * 100_000
-        raw_date["tzinfo"] = timezone(
-            {b"+": 1, b"-": -1}[raw_date.pop("tz_dir")]
-            * timedelta(
-                hours=raw_date.pop("tz_hour"),
-                minutes=raw_date.pop("tz_minute"),
-            ),
-        )
-
-        attribute["value"] = datetime(**raw_date)  # noqa: DTZ001
-        offset += attribute["value-length"]
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.RESERVED_STRING.value:
-        if attribute["value-length"] > 0:
-            offset_length = offset + attribute["value-length"]
-            attribute["value"] = data[offset:offset_length].decode("utf-8")
-            offset += attribute["value-length"]
-        else:
-            attribute["value"] = None
-
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.RANGE.value:
-        attribute["value"] = []
-        for i in range(int(attribute["value-length"] / 4)):
-            attribute["value"].append(struct.unpack_from(">i", data, offset + i * 4)[0])
-        offset += attribute["value-length"]
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.RESOLUTION.value:
-        attribute["value"] = struct.unpack_from(">iib", data, offset)
-        offset += attribute["value-length"]
-    elif attribute["tag"] in (IppTag.TEXT_LANG.value, IppTag.NAME_LANG.value):
-        attribute["language-length"] = struct.unpack_from(">h", data, offset)[0]
+    if tag in (IppTag.TEXT_LANG.value, IppTag.NAME_LANG.value):
+        attribute["language-length"] = _SHORT.unpack_from(data, offset)[0]
         offset += 2
 
         offset_length = offset + attribute["language-length"]
-        attribute["language"] = data[offset:offset_length].decode("utf-8")
-        offset += attribute["language-length"]
-        _LOGGER.debug("Attribute Language: %s", attribute["language"])
+        attribute["language"] = str(data[offset:offset_length], "utf-8")
+        attribute["text-length"] = _SHORT.unpack_from(data, offset_length)[0]
 
-        attribute["text-length"] = struct.unpack_from(">h", data, offset)[0]
-        offset += 2
-        _LOGGER.debug("Attribute Text Length: %s", attribute["text-length"])
-
-        offset_length = offset + attribute["text-length"]
-        attribute["value"] = data[offset:offset_length].decode("utf-8")
-        offset += attribute["text-length"]
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.BEGIN_COLLECTION.value:
-        offset += attribute["value-length"]
-        collection, new_offset = parse_collection(data, offset)
-        attribute["value"] = collection
-        offset = new_offset
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-    elif attribute["tag"] == IppTag.END_COLLECTION.value:
-        offset += attribute["value-length"]
-    else:
-        offset_length = offset + attribute["value-length"]
-        attribute["value"] = data[offset:offset_length]
-        _LOGGER.debug("Attribute Bytes: %s", attribute["value"])
-
-        attribute["value"] = attribute["value"].decode("utf-8", "ignore")
-        offset += attribute["value-length"]
-        _LOGGER.debug("Attribute Value: %s", attribute["value"])
-
-    return attribute, offset
+    if tag != _END_COLLECTION:
+        attribute["value"] = value
+
+    _LOGGER.debug("Attribute %s: %s", name or hex(tag), value)
+
+    return attribute, next_offset
 
 
 # pylint: disable=R0912,R0915
 def parse(  # noqa: PLR0912, PLR0915
     raw_data: bytes,
     contains_data: bool = False,  # noqa: FBT001, FBT002
+    *,
+    attributes: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    epoch_dates: bool = False,
 ) -> dict[str, Any]:
     r"""Parse raw IPP data.
 
+    When attributes is given only those attribute names are decoded, and
+    names in exclude are never decoded. Unwanted attributes, including
+    any additional values and nested collections, are skipped using only
+    their length fields. The operation attributes are always decoded.
+
+    With epoch_dates set, dateTime values are returned as seconds since
+    the epoch instead of datetime objects.
+
     1 byte: Protocol Major Version - b
     1 byte: Protocol Minor Version - b
     2 byte: Operation ID/Status Code - h
@@ -226,91 +395,89 @@ def parse(  # noqa: PLR0912, PLR0915
 
     1 byte: Attribute End Byte (\0x03)
     """
-    data: dict[str, Any] = {}
-    offset = 0
-
     _LOGGER.debug("Parsing IPP Data")
 
-    data["version"] = struct.unpack_from(">bb", raw_data, offset)
-    offset += 2
+    major, minor, status_code, request_id = _HEADER.unpack_from(raw_data, 0)
+    offset = _HEADER.size
+
+    data: dict[str, Any] = {
+        "version": (major, minor),
+        "status-code": status_code,
+        "request-id": request_id,
+        "operation-attributes": [],
+        "unsupported-attributes": [],
+        "jobs": [],
+        "printers": [],
+        "subscriptions": [],
+        "events": [],
+        "data": b"",
+    }
 
     _LOGGER.debug("IPP Version: %s", data["version"])
-
-    data["status-code"] = struct.unpack_from(">h", raw_data, offset)[0]
-    offset += 2
-
-    _LOGGER.debug("IPP Status Code: %s", data["status-code"])
-
-    data["request-id"] = struct.unpack_from(">i", raw_data, offset)[0]
-    offset += 4
-
-    data["operation-attributes"] = []
-    data["unsupported-attributes"] = []
-    data["jobs"] = []
-    data["printers"] = []
-    data["data"] = b""
+    _LOGGER.debug("IPP Status Code: %s", status_code)
 
     attribute_key = ""
     previous_attribute_name = ""
     tmp_data: dict[str, Any] = {}
 
-    while struct.unpack_from("b", raw_data, offset)[0] != IppTag.END.value:
+    allowed = (
+        None
+        if attributes is None
+        else frozenset(name.encode("utf-8") for name in attributes)
+    )
+    excluded = frozenset(name.encode("utf-8") for name in exclude or ())
+    selective = allowed is not None or bool(excluded)
+    skipping = False
+    decoders = EPOCH_VALUE_DECODERS if epoch_dates else VALUE_DECODERS
+
+    while (tag := raw_data[offset]) != _END:
         # check for operation, job or printer attribute start byte
         # if tmp data and attribute key is set, another operation was sent
         # add it and reset tmp data
-        if struct.unpack_from("b", raw_data, offset)[0] == IppTag.OPERATION.value:
+        if (group_key := GROUP_KEYS.get(tag)) is not None:
             if tmp_data and attribute_key:
                 data[attribute_key].append(tmp_data)
                 tmp_data = {}
 
-            attribute_key = "operation-attributes"
+            attribute_key = group_key
+            skipping = False
             offset += 1
-        elif struct.unpack_from("b", raw_data, offset)[0] == IppTag.JOB.value:
-            if tmp_data and attribute_key:
-                data[attribute_key].append(tmp_data)
-                tmp_data = {}
-
-            attribute_key = "jobs"
-            offset += 1
-        elif struct.unpack_from("b", raw_data, offset)[0] == IppTag.PRINTER.value:
-            if tmp_data and attribute_key:
-                data[attribute_key].append(tmp_data)
-                tmp_data = {}
-
-            attribute_key = "printers"
-            offset += 1
-        elif (
-            struct.unpack_from("b", raw_data, offset)[0]
-            == IppTag.UNSUPPORTED_GROUP.value
-        ):
-            if tmp_data and attribute_key:
-                data[attribute_key].append(tmp_data)
-                tmp_data = {}
-
-            attribute_key = "unsupported-attributes"
-            offset += 1
-        else:
-            attribute, new_offset = parse_attribute(
-                raw_data,
-                offset,
-                previous_attribute_name,
-            )
-
-            # if attribute has a name -> add it
-            # if attribute doesn't have a name -> it is part of an array
-            if attribute["name"]:
-                tmp_data[attribute["name"]] = attribute["value"]
-                previous_attribute_name = attribute["name"]
-            elif previous_attribute_name:
-                # check if attribute is already an array
-                # else convert it to an array
-                if isinstance(tmp_data[previous_attribute_name], list):
-                    tmp_data[previous_attribute_name].append(attribute["value"])
+            continue
+
+        if selective and attribute_key != "operation-attributes":
+            if name_length := _SHORT.unpack_from(raw_data, offset + 1)[0]:
+                raw_name = raw_data[offset + 3 : offset + 3 + name_length]
+                skipping = raw_name in excluded or (
+                    allowed is not None and raw_name not in allowed
+                )
+
+            if skipping:
+                if tag == _BEGIN_COLLECTION:
+                    offset = skip_attribute(raw_data, offset)
                 else:
-                    tmp_value = tmp_data[previous_attribute_name]
-                    tmp_data[previous_attribute_name] = [tmp_value, attribute["value"]]
+                    offset += 3 + name_length
+                    offset += 2 + _SHORT.unpack_from(raw_data, offset)[0]
+                continue
+
+        _, name, value, offset = decode_attribute(
+            raw_data,
+            offset,
+            previous_attribute_name,
+            decoders,
+        )
 
-            offset = new_offset
+        # if attribute has a name -> add it
+        # if attribute doesn't have a name -> it is part of an array
+        if name:
+            tmp_data[name] = value
+            previous_attribute_name = name
+        elif previous_attribute_name:
+            # check if attribute is already an array
+            # else convert it to an array
+            if isinstance(tmp_value := tmp_data[previous_attribute_name], list):
+                tmp_value.append(value)
+            else:
+                tmp_data[previous_attribute_name] = [tmp_value, value]
 
     if isinstance(data[attribute_key], list):
         data[attribute_key].append(tmp_data)
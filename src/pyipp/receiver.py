@@ -0,0 +1,166 @@
+"""Notification Receiver for IPP."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from struct import error as structerror
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiohttp import web
+from yarl import URL
+
+from .const import DEFAULT_CHARSET, DEFAULT_CHARSET_LANGUAGE
+from .enums import IppOperation, IppStatus
+from .models import Event
+from .parser import parse
+from .serializer import encode_dict
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable
+
+_LOGGER = logging.getLogger(__name__)
+
+_WILDCARD_HOSTS = frozenset({"", "0.0.0.0", "::"})  # noqa: S104
+
+
+class NotificationReceiver:
+    """Receive event notifications pushed by printers.
+
+    The receiver is a small HTTP server accepting Send-Notifications
+    requests at its recipient_uri, which is given to printers as the
+    notify-recipient-uri of their subscriptions. Each event is decoded
+    into an Event and fanned out to every listener and callback, so a
+    single receiver serves any number of printers and subscribers.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",  # noqa: S104
+        port: int = 0,
+        path: str = "/ipp/notify",
+        advertise_host: str | None = None,
+    ) -> None:
+        """Initialize the receiver, listening on a free port by default.
+
+        The advertise_host is the address printers reach the receiver at,
+        it defaults to the host listened on, and has to be given when
+        listening on all addresses.
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.advertise_host = advertise_host or host
+
+        self._runner: web.AppRunner | None = None
+        self._queues: dict[asyncio.Queue[Event], frozenset[int] | None] = {}
+        self._callbacks: list[Callable[[Event], Any]] = []
+
+    @property
+    def recipient_uri(self) -> str:
+        """Return the notify-recipient-uri of the receiver."""
+        if self.advertise_host in _WILDCARD_HOSTS:
+            raise ValueError(
+                "advertise_host is required when listening on all addresses",
+            )
+
+        return URL.build(
+            scheme="ipp",
+            host=self.advertise_host,
+            port=self.port,
+            path=self.path,
+        ).human_repr()
+
+    async def start(self) -> None:
+        """Start accepting notifications."""
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        # the port is only known once bound when listening on any free one
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop accepting notifications."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def add_callback(self, callback: Callable[[Event], Any]) -> Callable[[], None]:
+        """Call the callback, which may be a coroutine, with each event.
+
+        Returns a function removing the callback again.
+        """
+        self._callbacks.append(callback)
+
+        return lambda: self._callbacks.remove(callback)
+
+    async def listen(
+        self,
+        subscription_ids: Iterable[int] | None = None,
+    ) -> AsyncIterator[Event]:
+        """Yield the events received, only of the given subscriptions if any."""
+        queue: asyncio.Queue[Event] = asyncio.Queue()
+        self._queues[queue] = (
+            None if subscription_ids is None else frozenset(subscription_ids)
+        )
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            del self._queues[queue]
+
+    async def _dispatch(self, event: Event) -> None:
+        """Fan an event out to the listeners and callbacks."""
+        for queue, subscription_ids in self._queues.items():
+            if subscription_ids is None or event.subscription_id in subscription_ids:
+                queue.put_nowait(event)
+
+        for callback in list(self._callbacks):
+            if inspect.isawaitable(result := callback(event)):
+                await result
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Handle a Send-Notifications request."""
+        try:
+            message = parse(await request.read())
+        except (structerror, Exception):  # disable=broad-except
+            _LOGGER.debug("Invalid notification from %s", request.remote)
+            return web.Response(status=400)
+
+        if message["status-code"] == IppOperation.SEND_NOTIFICATIONS:
+            status = IppStatus.OK
+
+            for data in message["events"]:
+                await self._dispatch(Event.from_dict(data))
+        else:
+            status = IppStatus.ERROR_OPERATION_NOT_SUPPORTED
+
+        return web.Response(
+            body=encode_dict(
+                {
+                    "version": message["version"],
+                    "operation": status,
+                    "request-id": message["request-id"],
+                    "operation-attributes-tag": {
+                        "attributes-charset": DEFAULT_CHARSET,
+                        "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
+                    },
+                },
+            ),
+            content_type="application/ipp",
+        )
+
+    async def __aenter__(self) -> NotificationReceiver:  # noqa: PYI034
+        """Async enter."""
+        await self.start()
+
+        return self
+
+    async def __aexit__(self, *_exec_info: object) -> None:
+        """Async exit."""
+        await self.stop()
@@ -0,0 +1,199 @@
+"""Retry Policies and Circuit Breakers for IPP."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING
+
+import backoff
+
+from .enums import IppOperation, IppStatus
+from .exceptions import (
+    IPPCircuitOpenError,
+    IPPConnectionError,
+    IPPError,
+    IPPResponseError,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# operations which are safe to send again, as they do not change any state
+IDEMPOTENT_OPERATIONS = frozenset(
+    {
+        IppOperation.GET_JOB_ATTRIBUTES,
+        IppOperation.GET_JOBS,
+        IppOperation.GET_NOTIFICATIONS,
+        IppOperation.GET_PRINTER_ATTRIBUTES,
+        IppOperation.GET_PRINTER_SUPPORTED_VALUES,
+        IppOperation.GET_SUBSCRIPTION_ATTRIBUTES,
+        IppOperation.GET_SUBSCRIPTIONS,
+        IppOperation.VALIDATE_JOB,
+    },
+)
+
+RETRY_HTTP_STATUSES = frozenset({429, 502, 503, 504})
+RETRY_IPP_STATUSES = frozenset(
+    {
+        IppStatus.ERROR_BUSY,
+        IppStatus.ERROR_SERVICE_UNAVAILABLE,
+        IppStatus.ERROR_TEMPORARY,
+    },
+)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait from a Retry-After header, if any.
+
+    The header is either a number of seconds or a HTTP date.
+    """
+    if not value:
+        return None
+
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Policy for retrying requests which failed for transient reasons.
+
+    Connection errors and timeouts, the HTTP statuses in RETRY_HTTP_STATUSES
+    and busy IPP statuses are retried up to max_tries attempts in total,
+    with exponential backoff and full jitter in between. A Retry-After
+    header given by the server is honored, up to max_delay.
+
+    Only the given operations are retried, by default those which are safe
+    to send twice, as a timed out Print-Job might still have been printed.
+    """
+
+    max_tries: int = 3
+    delay: float = 0.5
+    factor: float = 2.0
+    max_delay: float = 30.0
+    jitter: bool = True
+    operations: frozenset[int] = field(default=IDEMPOTENT_OPERATIONS)
+
+    def delays(self) -> Iterator[float]:
+        """Yield the delays before each retry."""
+        wait = backoff.expo(
+            base=self.factor,
+            factor=self.delay,
+            max_value=self.max_delay,
+        )
+        next(wait)  # prime the generator, it is made for send()
+
+        for value in wait:
+            yield backoff.full_jitter(value) if self.jitter else value
+
+    def retry_delay(self, error: IPPError, delay: float) -> float | None:
+        """Return the delay before retrying after the error, None to give up."""
+        if isinstance(error, IPPCircuitOpenError):
+            return None
+
+        if isinstance(error, IPPConnectionError):
+            return delay
+
+        details = error.args[1] if len(error.args) > 1 else {}
+        status = details.get("status-code") if isinstance(details, dict) else None
+
+        if isinstance(error, IPPResponseError):
+            if status not in RETRY_HTTP_STATUSES:
+                return None
+        elif status not in RETRY_IPP_STATUSES:
+            return None
+
+        retry_after = parse_retry_after(details.get("retry-after"))
+        if retry_after is None:
+            return delay
+
+        return min(max(delay, retry_after), self.max_delay)
+
+
+@dataclass
+class _Circuit:
+    """State of the circuit of a single host."""
+
+    failures: int = 0
+    opened: float | None = None
+    probing: bool = False
+
+
+class CircuitBreaker:
+    """Short-circuit requests to hosts which are known to be unreachable.
+
+    After failure_threshold consecutive connection failures requests to the
+    host fail with IPPCircuitOpenError, until a probe after reset_timeout.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._circuits: dict[str, _Circuit] = {}
+
+    def state(self, host: str) -> str:
+        """Return the state of the circuit of the host.
+
+        This is one of "closed", "open" or "half-open".
+        """
+        circuit = self._circuits.get(host)
+
+        if circuit is None or circuit.opened is None:
+            return "closed"
+
+        if circuit.probing:
+            return "half-open"
+
+        return "open"
+
+    def allow(self, host: str) -> bool:
+        """Return whether a request to the host may be sent."""
+        circuit = self._circuits.get(host)
+
+        if circuit is None or circuit.opened is None:
+            return True
+
+        now = time.monotonic()
+        if now < circuit.opened + self.reset_timeout:
+            return False
+
+        # let a single probe through, or another one should it never finish
+        circuit.opened = now
+        circuit.probing = True
+
+        return True
+
+    def record_success(self, host: str) -> None:
+        """Close the circuit of the host as it answered."""
+        self._circuits.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        """Count a connection failure, opening the circuit at the threshold."""
+        circuit = self._circuits.setdefault(host, _Circuit())
+        circuit.failures += 1
+
+        if circuit.probing or circuit.failures >= self.failure_threshold:
+            circuit.opened = time.monotonic()
+            circuit.probing = False
+
+    def reset(self, host: str | None = None) -> None:
+        """Close the circuit of the host, or of all hosts."""
+        if host is None:
+            self._circuits.clear()
+        else:
+            self._circuits.pop(host, None)
@@ -1,99 +1,557 @@
 """Data Serializer for IPP."""
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
+import os
 import random
 import struct
-from typing import Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable
 
-from .const import DEFAULT_PROTO_VERSION
-from .enums import IppTag
+from .const import DEFAULT_CHARSET_LANGUAGE, DEFAULT_PROTO_VERSION
+from .enums import IppOperation, IppTag
 from .tags import ATTRIBUTE_TAG_MAP
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
 _LOGGER = logging.getLogger(__name__)
 
+_TAG = struct.Struct(">b")
+_SHORT = struct.Struct(">h")
+_INTEGER_VALUE = struct.Struct(">hi")
+_BOOLEAN_VALUE = struct.Struct(">h?")
+_DATE_VALUE = struct.Struct(">hhbbbbbbcbb")
+_RESOLUTION_VALUE = struct.Struct(">hiib")
+_RANGE_VALUE = struct.Struct(">hii")
+_HEADER = struct.Struct(">bbhi")
 
-def construct_attribute_values(tag: IppTag, value: Any) -> bytes:
-    """Serialize the attribute values into IPP format."""
-    byte_str = b""
-
-    if tag in (IppTag.INTEGER, IppTag.ENUM):
-        byte_str += struct.pack(">h", 4)
-        byte_str += struct.pack(">i", value)
-    elif tag == IppTag.BOOLEAN:
-        byte_str += struct.pack(">h", 1)
-        byte_str += struct.pack(">?", value)
+_OPERATION = IppTag.OPERATION.value
+_JOB = IppTag.JOB.value
+_PRINTER = IppTag.PRINTER.value
+_SUBSCRIPTION = IppTag.SUBSCRIPTION.value
+_EVENT_NOTIFICATION = IppTag.EVENT_NOTIFICATION.value
+
+_GROUPS = (
+    ("job-attributes-tag", _JOB),
+    ("printer-attributes-tag", _PRINTER),
+    ("subscription-attributes-tag", _SUBSCRIPTION),
+    ("event-notification-attributes-tag", _EVENT_NOTIFICATION),
+)
+
+_MEMBER_NAME = _TAG.pack(IppTag.MEMBER_NAME.value) + b"\x00\x00"
+_END_COLLECTION = _TAG.pack(IppTag.END_COLLECTION.value) + b"\x00\x00\x00\x00"
+
+# tags of values which are themselves a tuple, a list of these is multi-valued
+_SEQUENCE_TAGS = frozenset(
+    (
+        IppTag.RESOLUTION.value,
+        IppTag.RANGE.value,
+        IppTag.TEXT_LANG.value,
+        IppTag.NAME_LANG.value,
+    ),
+)
+
+# tags of collection members without a known tag, by type of the value
+_MEMBER_VALUE_TAGS: dict[type, IppTag] = {
+    bool: IppTag.BOOLEAN,
+    int: IppTag.INTEGER,
+    str: IppTag.KEYWORD,
+    bytes: IppTag.STRING,
+    datetime: IppTag.DATE,
+    dict: IppTag.BEGIN_COLLECTION,
+}
+
+
+def _write_integer(buffer: bytearray, value: Any) -> None:
+    """Write an integer or enum value into the buffer."""
+    buffer += _INTEGER_VALUE.pack(4, value)
+
+
+def _write_boolean(buffer: bytearray, value: Any) -> None:
+    """Write a boolean value into the buffer."""
+    buffer += _BOOLEAN_VALUE.pack(1, value)
+
+
+def _write_octets(buffer: bytearray, value: Any) -> None:
+    """Write an octetString value into the buffer."""
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+
+    buffer += _SHORT.pack(len(value))
+    buffer += value
+
+
+def _write_date(buffer: bytearray, value: datetime) -> None:
+    """Write a RFC 2579 DateAndTime value into the buffer.
+
+    Naive datetimes are written as UTC.
+    """
+    utc_offset = value.utcoffset()
+    minutes = int(utc_offset.total_seconds()) // 60 if utc_offset else 0
+
+    buffer += _DATE_VALUE.pack(
+        11,
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond // 100_000,
+        b"-" if minutes < 0 else b"+",
+        *divmod(abs(minutes), 60),
+    )
+
+
+def _write_resolution(buffer: bytearray, value: Any) -> None:
+    """Write a resolution value of cross feed, feed and units into the buffer."""
+    buffer += _RESOLUTION_VALUE.pack(9, *value)
+
+
+def _write_range(buffer: bytearray, value: Any) -> None:
+    """Write a rangeOfInteger value of lower and upper bound into the buffer."""
+    buffer += _RANGE_VALUE.pack(8, *value)
+
+
+def _write_string_with_language(buffer: bytearray, value: Any) -> None:
+    """Write a textWithLanguage or nameWithLanguage value into the buffer.
+
+    The value is a tuple of language and text, or only the text, which is
+    then written with the default language.
+    """
+    if isinstance(value, str):
+        language, text = DEFAULT_CHARSET_LANGUAGE, value
     else:
-        encoded_value = value.encode("utf-8")
-        byte_str += struct.pack(">h", len(encoded_value))
-        byte_str += encoded_value
+        language, text = value
 
-    return byte_str
+    encoded_language = language.encode("utf-8")
+    encoded_text = text.encode("utf-8")
 
+    buffer += _SHORT.pack(len(encoded_language) + len(encoded_text) + 4)
+    buffer += _SHORT.pack(len(encoded_language))
+    buffer += encoded_language
+    buffer += _SHORT.pack(len(encoded_text))
+    buffer += encoded_text
 
-def construct_attribute(name: str, value: Any, tag: IppTag | None = None) -> bytes:
-    """Serialize the attribute into IPP format."""
-    byte_str = b""
 
+def _write_no_value(buffer: bytearray, _value: Any) -> None:
+    """Write the empty value of an out-of-band or end of collection tag."""
+    buffer += b"\x00\x00"
+
+
+def _write_collection(buffer: bytearray, value: dict[str, Any]) -> None:
+    """Write a collection value and its member attributes into the buffer.
+
+    Members are tagged from the attribute tag map, or else by the type of
+    their value, so nested collections are written from nested dicts.
+    Members without any value are left out.
+    """
+    buffer += b"\x00\x00"
+
+    for name, member_value in value.items():
+        if isinstance(member_value, (list, tuple, set)) and not member_value:
+            continue
+
+        encoded_name = name.encode("utf-8")
+        buffer += _MEMBER_NAME
+        buffer += _SHORT.pack(len(encoded_name))
+        buffer += encoded_name
+
+        if not (tag := ATTRIBUTE_TAG_MAP.get(name)):
+            first_value = (
+                next(iter(member_value), None)
+                if isinstance(member_value, (list, tuple, set))
+                else member_value
+            )
+            tag = _MEMBER_VALUE_TAGS.get(type(first_value), IppTag.KEYWORD)
+
+            if tag is IppTag.KEYWORD and isinstance(first_value, int):
+                tag = IppTag.ENUM
+
+        _write_values(buffer, tag.value, b"\x00\x00", member_value)
+
+    buffer += _END_COLLECTION
+
+
+def _write_string(buffer: bytearray, value: Any) -> None:
+    """Write any other value into the buffer as an UTF-8 string."""
+    if value is None:
+        buffer += b"\x00\x00"
+        return
+
+    encoded_value = value.encode("utf-8")
+    buffer += _SHORT.pack(len(encoded_value))
+    buffer += encoded_value
+
+
+VALUE_WRITERS: dict[int, Callable[[bytearray, Any], None]] = {
+    IppTag.UNSUPPORTED_VALUE.value: _write_no_value,
+    IppTag.DEFAULT.value: _write_no_value,
+    IppTag.UNKNOWN.value: _write_no_value,
+    IppTag.NO_VALUE.value: _write_no_value,
+    IppTag.NOT_SETTABLE.value: _write_no_value,
+    IppTag.DELETE_ATTR.value: _write_no_value,
+    IppTag.ADMIN_DEFINE.value: _write_no_value,
+    IppTag.INTEGER.value: _write_integer,
+    IppTag.BOOLEAN.value: _write_boolean,
+    IppTag.ENUM.value: _write_integer,
+    IppTag.STRING.value: _write_octets,
+    IppTag.DATE.value: _write_date,
+    IppTag.RESOLUTION.value: _write_resolution,
+    IppTag.RANGE.value: _write_range,
+    IppTag.BEGIN_COLLECTION.value: _write_collection,
+    IppTag.TEXT_LANG.value: _write_string_with_language,
+    IppTag.NAME_LANG.value: _write_string_with_language,
+    IppTag.END_COLLECTION.value: _write_no_value,
+}
+
+
+def _write_attribute_values(buffer: bytearray, tag: IppTag, value: Any) -> None:
+    """Write the attribute value into the buffer in IPP format."""
+    VALUE_WRITERS.get(tag.value, _write_string)(buffer, value)
+
+
+def _write_values(
+    buffer: bytearray,
+    tag: int,
+    encoded_name: bytes,
+    value: Any,
+) -> None:
+    """Write one or more values, the first with the given length prefixed name."""
+    write_value = VALUE_WRITERS.get(tag, _write_string)
+
+    if tag in _SEQUENCE_TAGS:
+        # a single value is a tuple of integers, or of language and text,
+        # or a list of integers as returned by parse() for ranges
+        first = next(iter(value), None) if isinstance(value, (list, tuple)) else None
+        multiple = (
+            isinstance(value, list)
+            and not isinstance(first, int)
+            or isinstance(value, tuple)
+            and isinstance(first, (list, tuple))
+        )
+    else:
+        multiple = isinstance(value, (list, tuple, set))
+
+    if not multiple:
+        buffer += _TAG.pack(tag)
+        buffer += encoded_name
+        write_value(buffer, value)
+        return
+
+    encoded_tag = _TAG.pack(tag)
+
+    for index, list_value in enumerate(value):
+        buffer += encoded_tag
+        # additional values have an empty name
+        buffer += encoded_name if index == 0 else b"\x00\x00"
+        write_value(buffer, list_value)
+
+
+def _write_attribute(
+    buffer: bytearray,
+    name: str,
+    value: Any,
+    tag: IppTag | None = None,
+) -> None:
+    """Write the attribute into the buffer in IPP format."""
     if not tag and not (tag := ATTRIBUTE_TAG_MAP.get(name, None)):
         _LOGGER.debug("Unknown IppTag for %s", name)
-        return byte_str
+        return
 
-    if isinstance(value, (list, tuple, set)):
-        for index, list_value in enumerate(value):
-            byte_str += struct.pack(">b", tag.value)
+    encoded_name = name.encode("utf-8")
+    encoded_name = _SHORT.pack(len(encoded_name)) + encoded_name
 
-            if index == 0:
-                byte_str += struct.pack(">h", len(name))
-                byte_str += name.encode("utf-8")
-            else:
-                byte_str += struct.pack(">h", 0)
+    _write_values(buffer, tag.value, encoded_name, value)
 
-            byte_str += construct_attribute_values(tag, list_value)
-    else:
-        byte_str = struct.pack(">b", tag.value)
 
-        byte_str += struct.pack(">h", len(name))
-        byte_str += name.encode("utf-8")
+def construct_attribute_values(tag: IppTag, value: Any) -> bytes:
+    """Serialize the attribute values into IPP format."""
+    buffer = bytearray()
+    _write_attribute_values(buffer, tag, value)
 
-        byte_str += construct_attribute_values(tag, value)
+    return bytes(buffer)
 
-    return byte_str
 
+def construct_attribute(name: str, value: Any, tag: IppTag | None = None) -> bytes:
+    """Serialize the attribute into IPP format."""
+    buffer = bytearray()
+    _write_attribute(buffer, name, value, tag)
 
-def encode_dict(data: dict[str, Any]) -> bytes:
-    """Serialize a dictionary of data into IPP format."""
+    return bytes(buffer)
+
+
+def _encode_attributes(data: dict[str, Any]) -> bytearray:
+    """Serialize the header and attribute groups of a request message."""
     version = data["version"] or DEFAULT_PROTO_VERSION
     operation = data["operation"]
 
     if (request_id := data.get("request-id")) is None:
         request_id = random.choice(range(10000, 99999))  # nosec  # noqa: S311
 
-    encoded = struct.pack(">bb", *version)
-    encoded += struct.pack(">h", operation.value)
-    encoded += struct.pack(">i", request_id)
-
-    encoded += struct.pack(">b", IppTag.OPERATION.value)
+    buffer = bytearray(_HEADER.pack(*version, operation.value, request_id))
+    buffer += _TAG.pack(IppTag.OPERATION.value)
 
     if isinstance(data.get("operation-attributes-tag"), dict):
         for attr, value in data["operation-attributes-tag"].items():
-            encoded += construct_attribute(attr, value)
+            _write_attribute(buffer, attr, value)
+
+    for group, group_tag in _GROUPS:
+        if isinstance(group_data := data.get(group), dict):
+            group_data = [group_data]
+        elif not isinstance(group_data, list):
+            continue
 
-    if isinstance(data.get("job-attributes-tag"), dict):
-        encoded += struct.pack(">b", IppTag.JOB.value)
+        # a list holds one group of attributes per item, such as one per event
+        for attributes in group_data:
+            buffer += _TAG.pack(group_tag)
 
-        for attr, value in data["job-attributes-tag"].items():
-            encoded += construct_attribute(attr, value)
+            for attr, value in attributes.items():
+                _write_attribute(buffer, attr, value)
 
-    if isinstance(data.get("printer-attributes-tag"), dict):
-        encoded += struct.pack(">b", IppTag.PRINTER.value)
+    buffer += _TAG.pack(IppTag.END.value)
 
-        for attr, value in data["printer-attributes-tag"].items():
-            encoded += construct_attribute(attr, value)
+    return buffer
 
-    encoded += struct.pack(">b", IppTag.END.value)
+
+def encode_dict(data: dict[str, Any]) -> bytes:
+    """Serialize a dictionary of data into IPP format."""
+    buffer = _encode_attributes(data)
 
     if "data" in data:
-        encoded += data["data"]
+        # join copies the document once, rather than once per concatenation
+        return b"".join((buffer, data["data"]))
+
+    return bytes(buffer)
+
+
+async def iter_document(
+    document: Any,
+    chunk_size: int = 65536,
+) -> AsyncIterator[bytes]:
+    """Yield a document in chunks without reading it into memory.
+
+    The document is a bytes-like object, a file path, an object with a
+    read method, which may be a coroutine, or an async iterable of bytes.
+    Bytes-like objects are yielded as memoryview slices and files are
+    read in an executor, so the event loop is never blocked.
+    """
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        view = memoryview(document).cast("B")
+
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset : offset + chunk_size]
+    elif isinstance(document, (str, os.PathLike)):
+        with open(document, "rb") as file:  # noqa: PTH123, ASYNC230
+            async for chunk in iter_document(file, chunk_size):
+                yield chunk
+    elif hasattr(document, "read"):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if inspect.iscoroutinefunction(document.read):
+                chunk = await document.read(chunk_size)
+            else:
+                chunk = await loop.run_in_executor(None, document.read, chunk_size)
+
+            if not chunk:
+                break
+
+            yield chunk
+    elif hasattr(document, "__aiter__"):
+        async for chunk in document:
+            yield chunk
+    else:
+        raise TypeError(
+            f"Unsupported document type: {type(document).__name__}",  # noqa: EM102
+        )
+
+
+async def encode_stream(
+    data: dict[str, Any],
+    chunk_size: int = 65536,
+) -> AsyncIterator[bytes]:
+    """Serialize a dictionary of data into IPP format as a stream of chunks.
+
+    The encoded attributes are yielded first, followed by the document in
+    data, see iter_document(), so the document is never copied as a whole.
+    """
+    yield bytes(_encode_attributes(data))
+
+    if data.get("data") is not None:
+        async for chunk in iter_document(data["data"], chunk_size):
+            yield chunk
+
+
+class RequestTemplate:
+    """Request message encoded once for repeated sending.
+
+    Everything after the request header is encoded when the template is
+    created, so encoding the request again only packs the version,
+    operation and a fresh request id in front of the cached bytes.
+    """
+
+    __slots__ = ("operation", "version", "message", "_body")
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Encode the invariant part of the request message."""
+        self.message = data
+        self.operation: IppOperation = data["operation"]
+        self.version: tuple[int, int] = data["version"] or DEFAULT_PROTO_VERSION
+        self._body = encode_dict({**data, "request-id": 0})[_HEADER.size :]
+
+    def encode(
+        self,
+        request_id: int | None = None,
+        version: tuple[int, int] | None = None,
+    ) -> bytes:
+        """Return the encoded request with the given request id and version."""
+        if request_id is None:
+            request_id = random.choice(range(10000, 99999))  # nosec  # noqa: S311
+
+        major, minor = version or self.version
+
+        return _HEADER.pack(major, minor, self.operation.value, request_id) + self._body
+
+
+class IppRequest:
+    """Request message built attribute by attribute.
+
+    The builder keeps each attribute group as it is to be encoded, so it
+    is written straight into the request buffer without the merge step a
+    message dict needs. Operation attributes given to encode() as defaults
+    come first, in their order, unless the request overrides them.
+    """
+
+    __slots__ = ("operation", "version", "request_id", "data", "_groups")
+
+    def __init__(
+        self,
+        operation: IppOperation,
+        *,
+        version: tuple[int, int] | None = None,
+        request_id: int | None = None,
+    ) -> None:
+        """Initialize an empty request for the operation."""
+        self.operation = operation
+        self.version = version
+        self.request_id = request_id
+        self.data: Any = None
+        self._groups: dict[int, dict[str, tuple[Any, IppTag | None]]] = {
+            _OPERATION: {},
+        }
+
+    def operation_attr(
+        self,
+        name: str,
+        value: Any,
+        tag: IppTag | None = None,
+    ) -> IppRequest:
+        """Set an operation attribute, with a tag for unmapped attributes."""
+        self._groups[_OPERATION][name] = (value, tag)
+
+        return self
+
+    def job_attr(self, name: str, value: Any, tag: IppTag | None = None) -> IppRequest:
+        """Set a job attribute, with a tag for unmapped attributes."""
+        self._groups.setdefault(_JOB, {})[name] = (value, tag)
+
+        return self
+
+    def printer_attr(
+        self,
+        name: str,
+        value: Any,
+        tag: IppTag | None = None,
+    ) -> IppRequest:
+        """Set a printer attribute, with a tag for unmapped attributes."""
+        self._groups.setdefault(_PRINTER, {})[name] = (value, tag)
+
+        return self
+
+    def subscription_attr(
+        self,
+        name: str,
+        value: Any,
+        tag: IppTag | None = None,
+    ) -> IppRequest:
+        """Set a subscription template attribute, with a tag for unmapped ones."""
+        self._groups.setdefault(_SUBSCRIPTION, {})[name] = (value, tag)
+
+        return self
+
+    def document(self, data: Any) -> IppRequest:
+        """Set the document to send, anything iter_document() accepts."""
+        self.data = data
+
+        return self
+
+    def encode_attributes(
+        self,
+        defaults: dict[str, Any] | None = None,
+        version: tuple[int, int] | None = None,
+    ) -> bytearray:
+        """Serialize the header and attribute groups of the request.
+
+        The version of the request takes precedence over the one given.
+        """
+        major, minor = self.version or version or DEFAULT_PROTO_VERSION
+
+        if (request_id := self.request_id) is None:
+            request_id = random.choice(range(10000, 99999))  # nosec  # noqa: S311
+
+        buffer = bytearray(_HEADER.pack(major, minor, self.operation.value, request_id))
+        buffer += _TAG.pack(_OPERATION)
+
+        operation_attributes = self._groups[_OPERATION]
+
+        if defaults:
+            for attr, value in defaults.items():
+                if attr in operation_attributes:
+                    _write_attribute(buffer, attr, *operation_attributes[attr])
+                else:
+                    _write_attribute(buffer, attr, value)
+
+        for attr, (value, tag) in operation_attributes.items():
+            if not defaults or attr not in defaults:
+                _write_attribute(buffer, attr, value, tag)
+
+        for _, group_tag in _GROUPS:
+            if group_tag in self._groups:
+                buffer += _TAG.pack(group_tag)
+
+                for attr, (value, tag) in self._groups[group_tag].items():
+                    _write_attribute(buffer, attr, value, tag)
+
+        buffer += _TAG.pack(IppTag.END.value)
+
+        return buffer
+
+    def encode(
+        self,
+        defaults: dict[str, Any] | None = None,
+        version: tuple[int, int] | None = None,
+    ) -> bytes:
+        """Serialize the request and a bytes document into IPP format."""
+        buffer = self.encode_attributes(defaults, version)
+
+        if self.data is not None:
+            return b"".join((buffer, self.data))
+
+        return bytes(buffer)
+
+    async def encode_stream(
+        self,
+        defaults: dict[str, Any] | None = None,
+        version: tuple[int, int] | None = None,
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[bytes]:
+        """Serialize the request into IPP format as a stream of chunks."""
+        yield bytes(self.encode_attributes(defaults, version))
 
-    return encoded
+        if self.data is not None:
+            async for chunk in iter_document(self.data, chunk_size):
+                yield chunk
@@ -0,0 +1,193 @@
+"""Streaming Response Parser for IPP."""
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING, Any
+
+from .enums import IppTag
+from .exceptions import IPPParseError
+from .parser import GROUP_KEYS, decode_attribute
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_HEADER = struct.Struct(">bbhi")
+_SHORT = struct.Struct(">h")
+
+_END = IppTag.END.value
+_BEGIN_COLLECTION = IppTag.BEGIN_COLLECTION.value
+_END_COLLECTION = IppTag.END_COLLECTION.value
+
+
+def _attribute_end(data: bytearray, offset: int) -> int | None:
+    """Return the offset after a complete attribute, or None if more is needed."""
+    size = len(data)
+    depth = 0
+
+    while True:
+        if offset + 3 > size:
+            return None
+
+        tag = data[offset]
+        offset += 3 + _SHORT.unpack_from(data, offset + 1)[0]
+
+        if offset + 2 > size:
+            return None
+
+        offset += 2 + _SHORT.unpack_from(data, offset)[0]
+
+        if offset > size:
+            return None
+
+        if tag == _BEGIN_COLLECTION:
+            depth += 1
+        elif tag == _END_COLLECTION:
+            depth -= 1
+
+        if depth <= 0:
+            return offset
+
+
+class StreamParser:
+    """Push-style parser for IPP responses arriving in chunks.
+
+    Each call to feed() decodes every attribute that is complete so far
+    and returns the attribute groups that have been closed, as tuples of
+    group key and attributes. Consumed bytes are dropped from the buffer,
+    so memory is bounded by the largest single attribute rather than by
+    the size of the response.
+
+    With contains_data set, any bytes following the end of attributes tag
+    are document data, which is handed out by take_data() as it arrives,
+    chunk by chunk and without being copied into the buffer.
+    """
+
+    def __init__(
+        self,
+        contains_data: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Initialize the parser."""
+        self.contains_data = contains_data
+        self.version: tuple[int, int] | None = None
+        self.status_code: int | None = None
+        self.request_id: int | None = None
+        self.complete = False
+
+        self._buffer = bytearray()
+        self._attribute_key = ""
+        self._previous_attribute_name = ""
+        self._group: dict[str, Any] = {}
+        self._data: list[bytes] = []
+
+    # pylint: disable=R0912
+    def feed(self, chunk: bytes) -> list[tuple[str, dict[str, Any]]]:  # noqa: PLR0912
+        """Feed a chunk of the response and return the finished groups."""
+        if self.complete:
+            if self.contains_data and chunk:
+                self._data.append(chunk)
+
+            return []
+
+        buffer = self._buffer
+        buffer += chunk
+        offset = 0
+        groups: list[tuple[str, dict[str, Any]]] = []
+
+        if self.status_code is None:
+            if len(buffer) < _HEADER.size:
+                return groups
+
+            major, minor, self.status_code, self.request_id = _HEADER.unpack_from(
+                buffer,
+                0,
+            )
+            self.version = (major, minor)
+            offset = _HEADER.size
+
+        while offset < len(buffer):
+            tag = buffer[offset]
+
+            if tag == _END:
+                groups.append((self._attribute_key, self._group))
+                self._group = {}
+                self.complete = True
+                offset += 1
+                break
+
+            if (group_key := GROUP_KEYS.get(tag)) is not None:
+                if self._group and self._attribute_key:
+                    groups.append((self._attribute_key, self._group))
+                    self._group = {}
+
+                self._attribute_key = group_key
+                offset += 1
+                continue
+
+            if _attribute_end(buffer, offset) is None:
+                break
+
+            _, name, value, offset = decode_attribute(
+                buffer,
+                offset,
+                self._previous_attribute_name,
+            )
+
+            if name:
+                self._group[name] = value
+                self._previous_attribute_name = name
+            elif self._previous_attribute_name:
+                group = self._group
+                if isinstance(
+                    tmp_value := group[self._previous_attribute_name],
+                    list,
+                ):
+                    tmp_value.append(value)
+                else:
+                    group[self._previous_attribute_name] = [tmp_value, value]
+
+        if self.complete:
+            if self.contains_data and offset < len(buffer):
+                self._data.append(bytes(buffer[offset:]))
+
+            buffer.clear()
+        else:
+            del buffer[:offset]
+
+        return groups
+
+    def take_data(self) -> list[bytes]:
+        """Return and release the document data chunks received so far."""
+        data, self._data = self._data, []
+
+        return data
+
+    def close(self) -> None:
+        """Signal the end of the response."""
+        if not self.complete:
+            raise IPPParseError("Response ended before the end of attributes tag")
+
+
+def build_response(
+    stream_parser: StreamParser,
+    groups: Iterable[tuple[str, dict[str, Any]]],
+) -> dict[str, Any]:
+    """Build a response like the one from parse() out of streamed groups."""
+    data: dict[str, Any] = {
+        "version": stream_parser.version,
+        "status-code": stream_parser.status_code,
+        "request-id": stream_parser.request_id,
+        "operation-attributes": [],
+        "unsupported-attributes": [],
+        "jobs": [],
+        "printers": [],
+        "subscriptions": [],
+        "events": [],
+        "data": b"",
+    }
+
+    for key, group in groups:
+        data[key].append(group)
+
+    data["operation-attributes"] = next(iter(data["operation-attributes"]), {})
+
+    return data
@@ -49,6 +49,8 @@ ATTRIBUTE_TAG_MAP = {
     "printer-state": IppTag.ENUM,
     "printer-state-reasons": IppTag.KEYWORD,
     "printer-up-time": IppTag.INTEGER,
+    "printer-config-change-time": IppTag.INTEGER,
+    "printer-state-change-time": IppTag.INTEGER,
     "printer-uri-supported": IppTag.URI,
     "document-state": IppTag.ENUM,
     "device-uri": IppTag.URI,
@@ -62,4 +64,43 @@ ATTRIBUTE_TAG_MAP = {
     "media": IppTag.NAME,
     "center-of-pixel": IppTag.BOOLEAN,
     "sides": IppTag.KEYWORD,
+    "date-time-at-creation": IppTag.DATE,
+    "date-time-at-processing": IppTag.DATE,
+    "date-time-at-completed": IppTag.DATE,
+    "job-message-to-operator": IppTag.TEXT,
+    "job-password": IppTag.STRING,
+    "job-password-encryption": IppTag.KEYWORD,
+    "output-bin": IppTag.KEYWORD,
+    "page-ranges": IppTag.RANGE,
+    "print-color-mode": IppTag.KEYWORD,
+    "printer-resolution": IppTag.RESOLUTION,
+    "media-col": IppTag.BEGIN_COLLECTION,
+    "media-size": IppTag.BEGIN_COLLECTION,
+    "media-size-name": IppTag.KEYWORD,
+    "media-source": IppTag.KEYWORD,
+    "media-type": IppTag.KEYWORD,
+    "media-color": IppTag.KEYWORD,
+    "media-top-margin": IppTag.INTEGER,
+    "media-bottom-margin": IppTag.INTEGER,
+    "media-left-margin": IppTag.INTEGER,
+    "media-right-margin": IppTag.INTEGER,
+    "x-dimension": IppTag.INTEGER,
+    "y-dimension": IppTag.INTEGER,
+    "notify-charset": IppTag.CHARSET,
+    "notify-events": IppTag.KEYWORD,
+    "notify-get-interval": IppTag.INTEGER,
+    "notify-job-id": IppTag.INTEGER,
+    "notify-lease-duration": IppTag.INTEGER,
+    "notify-natural-language": IppTag.LANGUAGE,
+    "notify-pull-method": IppTag.KEYWORD,
+    "notify-recipient-uri": IppTag.URI,
+    "notify-sequence-number": IppTag.INTEGER,
+    "notify-sequence-numbers": IppTag.INTEGER,
+    "notify-subscribed-event": IppTag.KEYWORD,
+    "notify-subscription-id": IppTag.INTEGER,
+    "notify-subscription-ids": IppTag.INTEGER,
+    "notify-text": IppTag.TEXT,
+    "notify-time-interval": IppTag.INTEGER,
+    "notify-user-data": IppTag.STRING,
+    "notify-wait": IppTag.BOOLEAN,
 }
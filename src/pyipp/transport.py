@@ -0,0 +1,317 @@
+"""Transports for IPP."""
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from dataclasses import dataclass
+from socket import gaierror
+from typing import TYPE_CHECKING
+
+import aiohttp
+from yarl import URL
+
+from .exceptions import IPPConnectionError
+
+if TYPE_CHECKING:
+    import ssl
+    from collections.abc import Mapping
+
+
+@dataclass(frozen=True)
+class TransportResponse:
+    """Object holding the HTTP response to an IPP request."""
+
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+
+
+class Transport(ABC):
+    """Base class of the transports IPP requests are sent over.
+
+    Every IPP request is a single POST of an encoded message to a printer,
+    so a transport only needs to send that and return the response, read
+    in full. Connection failures are raised as IPPConnectionError, while
+    timeouts are left to the client. Requests are only sent again after
+    the server may have received them when they are idempotent.
+    """
+
+    @abstractmethod
+    async def post(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        path: str,
+        body: bytes,
+        headers: Mapping[str, str],
+        ssl_context: ssl.SSLContext | None = None,
+        *,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """Send an IPP request, over TLS if an SSL context is given."""
+
+    async def close(self) -> None:  # noqa: B027
+        """Close the connections of the transport, if it keeps any."""
+
+
+class AiohttpTransport(Transport):
+    """Transport over an aiohttp client session.
+
+    This is how IPP sends its requests when no transport is given, using
+    its own session.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None) -> None:
+        """Initialize the transport, with a session of its own by default."""
+        self.session = session
+        self._close_session = session is None
+
+    async def post(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        path: str,
+        body: bytes,
+        headers: Mapping[str, str],
+        ssl_context: ssl.SSLContext | None = None,
+        *,
+        idempotent: bool = False,  # noqa: ARG002
+    ) -> TransportResponse:
+        """Send an IPP request, over TLS if an SSL context is given.
+
+        aiohttp never sends a POST again on its own, idempotent or not.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        url = URL.build(
+            scheme="http" if ssl_context is None else "https",
+            host=host,
+            port=port,
+            path=path,
+        )
+
+        try:
+            async with self.session.post(
+                url,
+                data=body,
+                headers=headers,
+                ssl=ssl_context or False,
+            ) as response:
+                return TransportResponse(
+                    response.status,
+                    response.headers,
+                    await response.read(),
+                )
+        except (aiohttp.ClientError, gaierror) as exc:
+            raise IPPConnectionError(
+                "Error occurred while communicating with IPP server.",
+            ) from exc
+
+    async def close(self) -> None:
+        """Close the session, unless it was given."""
+        if self.session is not None and self._close_session:
+            await self.session.close()
+            self.session = None
+
+
+class _StaleConnectionError(ConnectionError):
+    """Connection closed before anything of the response was read."""
+
+
+class _ResponseHead:
+    """Status and headers of a HTTP/1.1 response."""
+
+    __slots__ = ("status", "headers", "keep_alive")
+
+    def __init__(self, lines: list[bytes]) -> None:
+        """Parse the status line and headers."""
+        version, status = lines[0].split(None, 2)[:2]
+
+        self.status = int(status)
+        self.headers: dict[str, str] = {}
+
+        for line in lines[1:]:
+            name, _, value = line.decode("latin-1").partition(":")
+            self.headers[name.strip().title()] = value.strip()
+
+        self.keep_alive = (
+            version == b"HTTP/1.1"
+            and self.headers.get("Connection", "").lower() != "close"
+        )
+
+
+class StreamTransport(Transport):
+    """Minimal HTTP/1.1 transport over asyncio streams.
+
+    The transport only does what IPP needs, POSTing application/ipp with a
+    known length, so it skips the URL parsing and header handling of a
+    general HTTP client. The request head is rendered once per endpoint,
+    responses are read straight into the bytes handed to the parser, and
+    connections are kept alive and reused, at most max_idle_per_host of
+    them per endpoint. Neither proxies nor redirects are supported.
+
+    A kept alive connection closed by the server shows either when the
+    request is written, or as no response at all. Requests are sent again
+    over a new connection in the first case, and only idempotent ones in
+    the second, as the server may have acted on the request before closing.
+    """
+
+    def __init__(self, *, max_idle_per_host: int = 4) -> None:
+        """Initialize the transport."""
+        self.max_idle_per_host = max_idle_per_host
+
+        self._heads: dict[tuple[str, int, str, tuple[tuple[str, str], ...]], bytes] = {}
+        self._idle: dict[
+            tuple[str, int, bool],
+            list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+        ] = {}
+
+    def _head(
+        self,
+        host: str,
+        port: int,
+        path: str,
+        headers: Mapping[str, str],
+    ) -> bytes:
+        """Return the request head, up to the content length value."""
+        key = (host, port, path, tuple(headers.items()))
+
+        if (head := self._heads.get(key)) is None:
+            # IPv6 literals are enclosed in brackets, as in URLs
+            authority = f"[{host}]" if ":" in host else host
+            lines = [f"POST {path} HTTP/1.1", f"Host: {authority}:{port}"]
+            lines.extend(f"{name}: {value}" for name, value in headers.items())
+            lines.append("Content-Length: ")
+
+            head = self._heads[key] = "\r\n".join(lines).encode("latin-1")
+
+        return head
+
+    async def post(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        path: str,
+        body: bytes,
+        headers: Mapping[str, str],
+        ssl_context: ssl.SSLContext | None = None,
+        *,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """Send an IPP request, over TLS if an SSL context is given."""
+        request = b"%b%d\r\n\r\n%b" % (
+            self._head(host, port, path, headers),
+            len(body),
+            body,
+        )
+        endpoint = (host, port, ssl_context is not None)
+        idle = self._idle.setdefault(endpoint, [])
+
+        try:
+            # a kept alive connection may have been closed by the server
+            # since, which only shows once nothing is read back from it
+            while idle:
+                reader, writer = idle.pop()
+
+                if reader.at_eof():
+                    writer.close()
+                    continue
+
+                with suppress(_StaleConnectionError):
+                    return await self._exchange(
+                        endpoint,
+                        reader,
+                        writer,
+                        request,
+                        idempotent=idempotent,
+                    )
+
+            reader, writer = await asyncio.open_connection(
+                host,
+                port,
+                ssl=ssl_context,
+                server_hostname=host if ssl_context is not None else None,
+            )
+
+            return await self._exchange(endpoint, reader, writer, request)
+        except (OSError, EOFError, ValueError, asyncio.LimitOverrunError) as exc:
+            raise IPPConnectionError(
+                "Error occurred while communicating with IPP server.",
+            ) from exc
+
+    async def _exchange(
+        self,
+        endpoint: tuple[str, int, bool],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        request: bytes,
+        *,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """Send a request over a connection and read the response.
+
+        Failures before any of the response was read are raised as
+        _StaleConnectionError when the request may be sent again.
+        """
+        try:
+            try:
+                writer.write(request)
+                await writer.drain()
+            except ConnectionError as exc:
+                raise _StaleConnectionError from exc
+
+            try:
+                raw_head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError) as exc:
+                if not idempotent or (
+                    isinstance(exc, asyncio.IncompleteReadError) and exc.partial
+                ):
+                    raise
+
+                raise _StaleConnectionError from exc
+
+            head = _ResponseHead(raw_head[:-4].split(b"\r\n"))
+
+            if head.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif (length := head.headers.get("Content-Length")) is not None:
+                body = await reader.readexactly(int(length))
+            else:
+                head.keep_alive = False
+                body = await reader.read()
+        except BaseException:
+            writer.close()
+            raise
+
+        idle = self._idle[endpoint]
+        if head.keep_alive and len(idle) < self.max_idle_per_host:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+        return TransportResponse(head.status, head.headers, body)
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        """Read a body sent with chunked transfer encoding."""
+        chunks = []
+
+        while size := int((await reader.readline()).split(b";", 1)[0], 16):
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+        # skip any trailers up to the final empty line
+        while (await reader.readline()).strip():
+            pass
+
+        return b"".join(chunks)
+
+    async def close(self) -> None:
+        """Close the connections kept alive."""
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+
+        self._idle.clear()
@@ -0,0 +1,202 @@
+"""Tests for Host Cache."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiohttp import ClientSession
+from aiohttp.web import Response
+
+from pyipp import IPP, AttributeCache, HostCache, parser
+from pyipp.enums import IppPrinterState, IppStatus
+from pyipp.serializer import encode_dict
+
+from . import (
+    DEFAULT_PRINTER_HOST,
+    DEFAULT_PRINTER_PATH,
+    DEFAULT_PRINTER_PORT,
+    DEFAULT_PRINTER_URI,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from aiohttp.web import Request
+    from aresponses import ResponsesMockServer
+
+MATCH_DEFAULT_HOST = f"{DEFAULT_PRINTER_HOST}:{DEFAULT_PRINTER_PORT}"
+
+
+def test_host_cache() -> None:
+    """Test facts are remembered per host."""
+    cache = HostCache()
+
+    assert cache.ipp_version("printer:631") is None
+    assert cache.get("printer:631", "other", "default") == "default"
+
+    cache.set_ipp_version("printer:631", (1, 1))
+    cache.set("printer:631", "other", 1)
+    cache.set("printer2:631", "other", 2)
+
+    assert cache.ipp_version("printer:631") == (1, 1)
+    assert cache.as_dict() == {
+        "printer:631": {"ipp-version": [1, 1], "other": 1},
+        "printer2:631": {"other": 2},
+    }
+
+    cache.clear("printer:631")
+    assert cache.ipp_version("printer:631") is None
+    assert cache.get("printer2:631", "other") == 2
+
+    cache.clear()
+    assert cache.as_dict() == {}
+
+
+def test_host_cache_persistence(tmp_path: Path) -> None:
+    """Test the cache is saved and loaded again."""
+    path = tmp_path / "hosts.json"
+
+    assert HostCache.load(path).as_dict() == {}
+
+    cache = HostCache()
+    cache.set_ipp_version("printer:631", (1, 0))
+    cache.save(path)
+
+    loaded = HostCache.load(path)
+
+    assert loaded.ipp_version("printer:631") == (1, 0)
+    assert loaded.as_dict() == cache.as_dict()
+
+
+class _Printer:
+    """Printer answering Get-Printer-Attributes with what was requested."""
+
+    def __init__(self) -> None:
+        """Initialize the printer."""
+        self.config_change_time = 100
+        self.state = IppPrinterState.IDLE
+        self.requested: list[list[str]] = []
+
+    async def handler(self, request: Request) -> Response:
+        """Answer a request."""
+        message = parser.parse(await request.read())
+        requested = message["operation-attributes"]["requested-attributes"]
+        self.requested.append(requested)
+
+        attributes: dict[str, Any] = {
+            "printer-state": self.state,
+            "printer-config-change-time": self.config_change_time,
+        }
+        if "printer-description" in requested:
+            attributes["printer-info"] = f"Printer {self.config_change_time}"
+            attributes["printer-location"] = "Office"
+
+        return Response(
+            body=encode_dict(
+                {
+                    "version": (2, 0),
+                    "operation": IppStatus.OK,
+                    "request-id": message["request-id"],
+                    "operation-attributes-tag": {
+                        "attributes-charset": "utf-8",
+                        "attributes-natural-language": "en-us",
+                    },
+                    "printer-attributes-tag": attributes,
+                },
+            ),
+            content_type="application/ipp",
+        )
+
+
+@pytest.mark.asyncio
+async def test_attribute_cache(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test stale groups are fetched, and all on configuration changes."""
+    now = 1000.0
+    monkeypatch.setattr("pyipp.cache.time.monotonic", lambda: now)
+
+    printer = _Printer()
+    for _ in range(7):
+        aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", printer.handler)
+
+    cache = AttributeCache(
+        ttls={"printer-description": 60},
+        volatile=["printer-state"],
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, attribute_cache=cache)
+
+        attributes = await cache.printer_attributes(ipp)
+        assert attributes["printer-info"] == "Printer 100"
+        assert printer.requested.pop() == [
+            "printer-state",
+            "printer-config-change-time",
+            "printer-description",
+        ]
+
+        # only the volatile attributes until the group is stale
+        printer.state = IppPrinterState.PROCESSING
+        now += 30
+        attributes = await cache.printer_attributes(ipp)
+        assert attributes["printer-state"] == IppPrinterState.PROCESSING
+        assert attributes["printer-location"] == "Office"
+        assert printer.requested.pop() == ["printer-state", "printer-config-change-time"]
+
+        now += 30
+        await cache.printer_attributes(ipp)
+        assert printer.requested.pop()[-1] == "printer-description"
+
+        # the configuration changed, so the group is fetched right away
+        printer.config_change_time = 200
+        attributes = await cache.printer_attributes(ipp)
+        assert attributes["printer-info"] == "Printer 200"
+        assert printer.requested[-2:] == [
+            ["printer-state", "printer-config-change-time"],
+            ["printer-state", "printer-config-change-time", "printer-description"],
+        ]
+
+        # printer() uses the cache
+        assert (await ipp.printer()).info.location == "Office"
+        assert len(printer.requested) == 3
+
+        cache.invalidate(ipp.printer_uri)
+        assert (await ipp.printer()).info.printer_info == "Printer 200"
+        assert printer.requested.pop()[-1] == "printer-description"
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_attribute_cache_per_printer(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test groups are fetched on the first poll of each queue of a host."""
+    # (now - ttl) + ttl rounds up to more than now
+    monkeypatch.setattr("pyipp.cache.time.monotonic", lambda: 1175.0866774770273)
+
+    printer = _Printer()
+    for _ in range(2):
+        aresponses.add(MATCH_DEFAULT_HOST, aresponses.ANY, "POST", printer.handler)
+
+    cache = AttributeCache(ttls={"printer-description": 3600.0}, volatile=[])
+
+    async with ClientSession() as session:
+        for path in ("/printers/a", "/printers/b"):
+            ipp = IPP(
+                DEFAULT_PRINTER_HOST,
+                port=DEFAULT_PRINTER_PORT,
+                base_path=path,
+                session=session,
+                attribute_cache=cache,
+            )
+            await cache.printer_attributes(ipp)
+
+    assert printer.requested == [
+        ["printer-config-change-time", "printer-description"],
+        ["printer-config-change-time", "printer-description"],
+    ]
+    aresponses.assert_plan_strictly_followed()
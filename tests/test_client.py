@@ -1,11 +1,15 @@
 """Tests for IPP Client."""
+from __future__ import annotations
+
 import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 import pytest
 from aiohttp import ClientResponse, ClientSession
 from aresponses import Response, ResponsesMockServer
 
-from pyipp import IPP
+from pyipp import IPP, HostCache, parser
 from pyipp.const import DEFAULT_PRINTER_ATTRIBUTES
 from pyipp.enums import IppOperation
 from pyipp.exceptions import (
@@ -24,6 +28,11 @@ from . import (
     load_fixture_binary,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+    from aiohttp.web import Request
+
 MATCH_DEFAULT_HOST = f"{DEFAULT_PRINTER_HOST}:{DEFAULT_PRINTER_PORT}"
 NON_STANDARD_PORT = 3333
 
@@ -55,6 +64,65 @@ async def test_ipp_request(aresponses: ResponsesMockServer) -> None:
         assert response["status-code"] == 0
 
 
+@pytest.mark.asyncio
+async def test_ipp_request_allow_list(aresponses: ResponsesMockServer) -> None:
+    """Test IPP response is only decoded for allowed attributes."""
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        response = await ipp.execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            {
+                "operation-attributes-tag": {
+                    "requested-attributes": DEFAULT_PRINTER_ATTRIBUTES,
+                },
+            },
+            attributes=["printer-name", "printer-state"],
+            exclude=["printer-state"],
+        )
+        assert list(response["printers"][0]) == ["printer-name"]
+
+
+@pytest.mark.asyncio
+async def test_ipp_request_attributes_retried(aresponses: ResponsesMockServer) -> None:
+    """Test attributes given as iterator limit responses parsed again."""
+    for fixture in (
+        "get-printer-attributes-error-0x0503.bin",
+        "get-printer-attributes-epsonxp6000.bin",
+    ):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=load_fixture_binary(fixture),
+            ),
+        )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        response = await ipp.execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            {},
+            attributes=iter(["printer-name"]),
+        )
+        assert list(response["printers"][0]) == ["printer-name"]
+
+    aresponses.assert_plan_strictly_followed()
+
+
 @pytest.mark.asyncio
 async def test_internal_session(aresponses: ResponsesMockServer) -> None:
     """Test IPP response is handled correctly."""
@@ -225,6 +293,76 @@ async def test_http_error426(aresponses: ResponsesMockServer) -> None:
             )
 
 
+@pytest.mark.asyncio
+async def test_tls_upgrade(aresponses: ResponsesMockServer) -> None:
+    """Test requests are sent again over TLS on HTTP 426 when opted in."""
+    printer_uris = []
+
+    async def response_handler(request: Request) -> Response:
+        message = parser.parse(await request.read())
+        printer_uris.append(message["operation-attributes"]["printer-uri"])
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        )
+
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            text="Upgrade Required",
+            headers={"Upgrade": "TLS/1.0, HTTP/1.1"},
+            status=426,
+        ),
+    )
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(text="Upgrade Required", status=426),
+    )
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+
+    cache = HostCache()
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            tls_upgrade=True,
+            host_cache=cache,
+        )
+        assert await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+        assert ipp.tls
+
+        # other clients sharing the cache go straight to TLS
+        other = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            tls_upgrade=True,
+            host_cache=cache,
+        )
+        assert await other.printer()
+        assert other.tls
+
+        # the request template of printer() is built again for TLS
+        third = IPP(DEFAULT_PRINTER_URI, session=session, tls_upgrade=True)
+        assert await third.printer()
+        assert third.tls
+
+    assert printer_uris == [
+        f"ipps://{MATCH_DEFAULT_HOST}{DEFAULT_PRINTER_PATH}",
+        f"ipps://{MATCH_DEFAULT_HOST}{DEFAULT_PRINTER_PATH}",
+        f"ipps://{MATCH_DEFAULT_HOST}{DEFAULT_PRINTER_PATH}",
+    ]
+    assert cache.get(MATCH_DEFAULT_HOST, "tls")
+    aresponses.assert_plan_strictly_followed()
+
+
 @pytest.mark.asyncio
 async def test_unexpected_response(aresponses: ResponsesMockServer) -> None:
     """Test unexpected response handling."""
@@ -251,19 +389,22 @@ async def test_unexpected_response(aresponses: ResponsesMockServer) -> None:
 @pytest.mark.asyncio
 async def test_ipp_error_0x0503(aresponses: ResponsesMockServer) -> None:
     """Test IPP Error 0x0503 response handling."""
-    aresponses.add(
-        MATCH_DEFAULT_HOST,
-        DEFAULT_PRINTER_PATH,
-        "POST",
-        aresponses.Response(
-            status=200,
-            headers={"Content-Type": "application/ipp"},
-            body=load_fixture_binary("get-printer-attributes-error-0x0503.bin"),
-        ),
-    )
+    for _ in range(3):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=load_fixture_binary("get-printer-attributes-error-0x0503.bin"),
+            ),
+        )
+
+    cache = HostCache()
 
     async with ClientSession() as session:
-        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, host_cache=cache)
         with pytest.raises(IPPVersionNotSupportedError):
             assert await ipp.execute(
                 IppOperation.GET_PRINTER_ATTRIBUTES,
@@ -273,3 +414,151 @@ async def test_ipp_error_0x0503(aresponses: ResponsesMockServer) -> None:
                     },
                 },
             )
+
+    # no version worked, so none is kept
+    assert ipp.ipp_version == (2, 0)
+    assert cache.ipp_version(MATCH_DEFAULT_HOST) is None
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_version_negotiation_concurrent(aresponses: ResponsesMockServer) -> None:
+    """Test concurrent requests step down from the version they were sent with."""
+    versions = []
+
+    async def response_handler(request: Request) -> Response:
+        version = tuple((await request.read())[:2])
+        versions.append(version)
+        await asyncio.sleep(0.05)
+
+        fixture = (
+            "get-printer-attributes-error-0x0503.bin"
+            if version > (1, 1)
+            else "get-printer-attributes-epsonxp6000.bin"
+        )
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary(fixture),
+        )
+
+    for _ in range(4):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            response_handler,
+        )
+
+    cache = HostCache()
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, host_cache=cache)
+
+        async def execute() -> None:
+            assert await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+        # the second request is sent before the first one stepped down
+        first = asyncio.ensure_future(execute())
+        await asyncio.sleep(0.02)
+        await asyncio.gather(first, execute())
+
+    assert versions == [(2, 0), (2, 0), (1, 1), (1, 1)]
+    assert ipp.ipp_version == (1, 1)
+    assert cache.ipp_version(MATCH_DEFAULT_HOST) == (1, 1)
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_version_negotiation(aresponses: ResponsesMockServer) -> None:
+    """Test the IPP version is stepped down and remembered for the host."""
+    versions = []
+
+    def response_handler(
+        fixture: str,
+    ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        async def handler(request: Request) -> Response:
+            versions.append(tuple((await request.read())[:2]))
+            return aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=load_fixture_binary(fixture),
+            )
+
+        return handler
+
+    for fixture in (
+        "get-printer-attributes-error-0x0503.bin",
+        "get-printer-attributes-epsonxp6000.bin",
+        "get-printer-attributes-epsonxp6000.bin",
+        "get-printer-attributes-epsonxp6000.bin",
+    ):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            response_handler(fixture),
+        )
+
+    cache = HostCache()
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, host_cache=cache)
+        printer = await ipp.printer()
+        assert printer.info.name == "EPSON XP-6000 Series"
+        assert ipp.ipp_version == (1, 1)
+
+        # the cached request template is sent with the negotiated version
+        assert await ipp.printer()
+
+        # other clients sharing the cache start out with that version
+        other = IPP(DEFAULT_PRINTER_URI, session=session, host_cache=cache)
+        assert await other.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+    assert versions == [(2, 0), (1, 1), (1, 1), (1, 1)]
+    assert cache.ipp_version(MATCH_DEFAULT_HOST) == (1, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_type", [None, ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_offload_parsing(
+    aresponses: ResponsesMockServer,
+    executor_type: type[Executor] | None,
+) -> None:
+    """Test large responses are parsed in an executor, transparently."""
+    fixture = load_fixture_binary("get-printer-attributes-epsonxp6000.bin")
+
+    for _ in range(3):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=fixture,
+            ),
+        )
+
+    executor = executor_type(max_workers=1) if executor_type is not None else None
+
+    try:
+        async with ClientSession() as session:
+            ipp = IPP(
+                DEFAULT_PRINTER_URI,
+                session=session,
+                offload_threshold=len(fixture) - 1,
+                executor=executor,
+            )
+            response = await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+            assert response == parser.parse(fixture)
+
+            printer = await ipp.printer()
+            assert printer.info.name == "EPSON XP-6000 Series"
+
+            # responses up to the threshold are parsed on the loop
+            ipp.offload_threshold = len(fixture)
+            assert await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {}) == response
+    finally:
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,211 @@
+"""Tests for Request Coalescing."""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp import ClientSession
+
+from pyipp import IPP, IPPResponseError, RequestCoalescer
+from pyipp.enums import IppOperation
+
+from . import (
+    DEFAULT_PRINTER_HOST,
+    DEFAULT_PRINTER_PATH,
+    DEFAULT_PRINTER_PORT,
+    DEFAULT_PRINTER_URI,
+    load_fixture_binary,
+)
+
+if TYPE_CHECKING:
+    from aiohttp.web import Request, Response
+    from aresponses import ResponsesMockServer
+
+MATCH_DEFAULT_HOST = f"{DEFAULT_PRINTER_HOST}:{DEFAULT_PRINTER_PORT}"
+
+
+def _add_printer_response(aresponses: ResponsesMockServer, delay: float = 0) -> None:
+    """Add a slow printer attributes response."""
+
+    async def response_handler(_: Request) -> Response:
+        await asyncio.sleep(delay)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        )
+
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+
+
+@pytest.mark.asyncio
+async def test_coalesce(aresponses: ResponsesMockServer) -> None:
+    """Test concurrent identical requests of clients are sent once."""
+    _add_printer_response(aresponses, 0.1)
+    _add_printer_response(aresponses)
+
+    coalescer = RequestCoalescer()
+
+    async with ClientSession() as session:
+        ipp1 = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+        ipp2 = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+
+        results = await asyncio.gather(
+            ipp1.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {}),
+            ipp2.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {}),
+            ipp1.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {}),
+        )
+        assert results[0] is results[1] is results[2]
+        assert coalescer.in_flight == 0
+
+        # requests parsed differently are not identical
+        assert await ipp1.execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            {},
+            attributes=["printer-name"],
+        )
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_credentials(aresponses: ResponsesMockServer) -> None:
+    """Test requests sent with other credentials are not shared."""
+    _add_printer_response(aresponses, 0.1)
+    _add_printer_response(aresponses, 0.1)
+
+    coalescer = RequestCoalescer(ttl=60)
+
+    async with ClientSession() as session:
+        ipp1 = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            coalescer=coalescer,
+            username="alice",
+            password="secret",  # noqa: S106
+        )
+        ipp2 = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+
+        results = await asyncio.gather(
+            ipp1.execute(IppOperation.GET_JOBS, {}),
+            ipp2.execute(IppOperation.GET_JOBS, {}),
+        )
+        assert results[0] is not results[1]
+
+        # nor are the results kept
+        assert await ipp1.execute(IppOperation.GET_JOBS, {}) is results[0]
+        assert await ipp2.execute(IppOperation.GET_JOBS, {}) is results[1]
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_ttl(aresponses: ResponsesMockServer) -> None:
+    """Test results are kept for the ttl."""
+    _add_printer_response(aresponses)
+
+    coalescer = RequestCoalescer(ttl=60)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+
+        printer = await ipp.printer()
+        assert await ipp.printer() == printer
+
+        # operations changing state are neither coalesced nor kept
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(status=503, text="Busy"),
+            repeat=3,
+        )
+
+        for _ in range(2):
+            with pytest.raises(IPPResponseError):
+                await ipp.execute(IppOperation.PAUSE_PRINTER, {})
+
+        coalescer.clear()
+        with pytest.raises(IPPResponseError):
+            await ipp.printer()
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_cancel(aresponses: ResponsesMockServer) -> None:
+    """Test cancelling a caller leaves the others waiting."""
+    _add_printer_response(aresponses, 0.1)
+
+    coalescer = RequestCoalescer()
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+
+        first = asyncio.ensure_future(ipp.printer())
+        second = asyncio.ensure_future(ipp.printer())
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second
+        assert first.cancelled()
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_error(aresponses: ResponsesMockServer) -> None:
+    """Test errors are raised to all callers and not kept."""
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(status=404, text="Not Found"),
+    )
+    _add_printer_response(aresponses)
+
+    coalescer = RequestCoalescer(ttl=60)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, coalescer=coalescer)
+
+        results = await asyncio.gather(
+            ipp.printer(),
+            ipp.printer(),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, IPPResponseError) for result in results)
+
+        assert await ipp.printer()
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_ttl_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test results expire after the ttl, also those never asked for again."""
+    now = 1000.0
+    monkeypatch.setattr("pyipp.coalesce.time.monotonic", lambda: now)
+
+    coalescer = RequestCoalescer(ttl=10)
+    calls = []
+
+    async def request(value: str) -> str:
+        calls.append(value)
+        return value
+
+    assert await coalescer.run("a", lambda: request("a")) == "a"
+    now += 5
+    assert await coalescer.run("b", lambda: request("b")) == "b"
+    assert await coalescer.run("a", lambda: request("a")) == "a"
+    assert calls == ["a", "b"]
+
+    now += 5
+    assert await coalescer.run("b", lambda: request("b")) == "b"
+    assert calls == ["a", "b"]
+    assert list(coalescer._results) == ["b"]
+
+    now += 5
+    assert await coalescer.run("a", lambda: request("a")) == "a"
+    assert calls == ["a", "b", "a"]
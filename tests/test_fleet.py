@@ -0,0 +1,250 @@
+"""Tests for Fleet Management."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiohttp.web import Request, Response
+from aresponses import ResponsesMockServer
+
+from pyipp import (
+    AdaptiveScheduler,
+    FleetPoller,
+    IPPConnectionError,
+    IPPResponseError,
+    PollResult,
+    Printer,
+    SessionManager,
+)
+
+from . import DEFAULT_PRINTER_PATH, DEFAULT_PRINTER_PORT, load_fixture_binary
+
+
+@pytest.mark.asyncio
+async def test_session_manager(aresponses: ResponsesMockServer) -> None:
+    """Test clients of a session manager share one session."""
+    for host in ("printer1.local", "printer2.local"):
+        aresponses.add(
+            f"{host}:{DEFAULT_PRINTER_PORT}",
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+            ),
+        )
+
+    manager = SessionManager(limit=10, limit_per_host=1, keepalive_timeout=5)
+
+    async with manager:
+        session = manager.session
+        assert session is not None
+        assert manager.references == 1
+
+        connector = session.connector
+        assert connector is not None
+        assert connector.limit == 10
+        assert connector.limit_per_host == 1
+
+        async with manager.client("ipp://printer1.local:631/ipp/print") as ipp1:
+            ipp2 = manager.client("printer2.local")
+
+            assert await ipp1.printer()
+            assert await ipp2.printer()
+            assert ipp1.session is session
+            assert ipp2.session is session
+            assert manager.references == 3
+
+            await ipp2.close()
+            assert ipp2.session is None
+            assert manager.references == 2
+
+        assert manager.references == 1
+        assert not session.closed
+
+    assert manager.references == 0
+    assert manager.session is None
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_session_manager_last_client(aresponses: ResponsesMockServer) -> None:
+    """Test the session is closed with the last client."""
+    aresponses.add(
+        f"printer.local:{DEFAULT_PRINTER_PORT}",
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        ),
+        repeat=2,
+    )
+
+    manager = SessionManager()
+
+    async with manager.client("printer.local") as ipp:
+        assert await ipp.printer()
+        session = manager.session
+
+    assert session is not None
+    assert session.closed
+
+    async with manager.client("printer.local") as ipp:
+        assert await ipp.printer()
+        assert manager.session is not session
+
+
+@pytest.mark.asyncio
+async def test_fleet_poller(aresponses: ResponsesMockServer) -> None:
+    """Test polling a fleet with bounded concurrency."""
+    active = []
+    peak = []
+
+    async def response_handler(request: Request) -> Response:
+        """Respond slowly while tracking the concurrent requests."""
+        active.append(request)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(request)
+
+        if request.host.startswith("printer3"):
+            return aresponses.Response(status=404)
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        )
+
+    aresponses.add(
+        aresponses.ANY,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        response_handler,
+        repeat=aresponses.INFINITY,
+    )
+
+    uris = [f"ipp://printer{i}.local:631/ipp/print" for i in range(6)]
+    seen = []
+    cycles = []
+
+    poller = FleetPoller(
+        uris,
+        concurrency=2,
+        interval=0,
+        jitter=0.01,
+        callback=seen.append,
+        on_cycle=cycles.append,
+    )
+    results = [result async for result in poller.run(cycles=2)]
+    await poller.close()
+
+    assert len(results) == 12
+    assert seen == results
+    assert max(peak) <= 2
+    assert {result.uri for result in results} == set(uris)
+
+    failed = [result for result in results if result.error is not None]
+    assert {result.uri for result in failed} == {uris[3]}
+    assert isinstance(failed[0].error, IPPResponseError)
+    assert all(
+        isinstance(result.printer, Printer)
+        for result in results
+        if result.error is None
+    )
+
+    assert [stats.cycle for stats in cycles] == [1, 2]
+    assert poller.stats is cycles[-1]
+    assert poller.stats.polled == 6
+    assert poller.stats.failed == 1
+    assert poller.stats.poll_min <= poller.stats.poll_p95 <= poller.stats.poll_max
+    assert poller.stats.throughput > 0
+    assert poller.session_manager.session is None
+
+
+def test_adaptive_scheduler_intervals() -> None:
+    """Test the poll interval adapts to the printer state."""
+    uri = "ipp://printer.local:631/ipp/print"
+    scheduler = AdaptiveScheduler([uri], min_interval=1, max_interval=100)
+
+    def next_interval(printer: Printer | None) -> float:
+        """Return the interval after a poll, as the scheduler would."""
+        result = PollResult(
+            uri,
+            printer,
+            None if printer else IPPConnectionError(),
+            0,
+            0,
+        )
+        interval = scheduler.poll_intervals[uri] = scheduler._next_interval(result)
+
+        return interval
+
+    idle = Printer.from_dict({"printer-state": 3})
+    printing = Printer.from_dict({"printer-state": 4})
+    reasons = Printer.from_dict(
+        {"printer-state": 3, "printer-state-reasons": "media-low"},
+    )
+
+    assert next_interval(idle) == 60
+    assert next_interval(idle) == 60
+    assert next_interval(printing) == 2.5
+    assert next_interval(printing) == 3.75
+    assert next_interval(printing) == 5
+    assert next_interval(reasons) == 2.5
+    assert next_interval(reasons) == 3.75
+    assert next_interval(idle) == 1.875
+    assert next_interval(idle) == 2.8125
+    assert next_interval(None) == 5.625
+    assert next_interval(None) == 11.25
+
+    scheduler = AdaptiveScheduler([uri], freshness=30)
+    assert next_interval(idle) == 30
+
+
+@pytest.mark.asyncio
+async def test_adaptive_scheduler(aresponses: ResponsesMockServer) -> None:
+    """Test the scheduler polls printers again when due."""
+    aresponses.add(
+        aresponses.ANY,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        ),
+        repeat=aresponses.INFINITY,
+    )
+
+    uris = [f"ipp://printer{i}.local:631/ipp/print" for i in range(2)]
+    seen = []
+
+    scheduler = AdaptiveScheduler(
+        uris,
+        intervals={"idle": 0.02},
+        min_interval=0.01,
+        jitter=0,
+        callback=seen.append,
+    )
+
+    results = []
+    polling = scheduler.run()
+    async for result in polling:
+        results.append(result)
+
+        if len(results) == 6:
+            break
+
+    await polling.aclose()
+    await scheduler.close()
+
+    assert seen == results
+    assert [result.uri for result in results].count(uris[0]) == 3
+    assert all(isinstance(result.printer, Printer) for result in results)
+    assert scheduler.poll_intervals == {uri: 0.02 for uri in uris}
+    assert scheduler.polls >= 6
+    assert scheduler.session_manager.session is None
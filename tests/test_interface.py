@@ -1,11 +1,21 @@
 """Tests for IPP public interface."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import pytest
 from aiohttp import ClientSession
-from aresponses import ResponsesMockServer
+from aiohttp.web import Response
 
-from pyipp import IPP, Printer
-from pyipp.const import DEFAULT_PRINTER_ATTRIBUTES
-from pyipp.enums import IppOperation
+from pyipp import IPP, Event, IppRequest, Printer, parser
+from pyipp.const import (
+    CHANGE_PRINTER_ATTRIBUTES,
+    DEFAULT_JOB_ATTRIBUTES,
+    DEFAULT_PRINTER_ATTRIBUTES,
+)
+from pyipp.enums import IppOperation, IppStatus
+from pyipp.exceptions import IPPParseError
+from pyipp.serializer import encode_dict
 
 from . import (
     DEFAULT_PRINTER_HOST,
@@ -15,6 +25,12 @@ from . import (
     load_fixture_binary,
 )
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from aiohttp.web import Request
+    from aresponses import ResponsesMockServer
+
 MATCH_DEFAULT_HOST = f"{DEFAULT_PRINTER_HOST}:{DEFAULT_PRINTER_PORT}"
 
 
@@ -62,9 +78,143 @@ async def test_printer_update_logic(aresponses: ResponsesMockServer) -> None:
         assert printer
         assert isinstance(printer, Printer)
 
+        template = ipp._printer_template
         printer = await ipp.printer()
         assert printer
         assert isinstance(printer, Printer)
+        assert ipp._printer_template is template
+
+
+class _ChangingPrinter:
+    """Printer answering change time requests apart from full ones."""
+
+    def __init__(self, change_times: dict[str, int]) -> None:
+        """Initialize the printer with its change times and up-time."""
+        self.change_times = change_times
+        self.requests: list[str] = []
+        self.broken = False
+
+    async def handler(self, request: Request) -> Response:
+        """Answer a request."""
+        message = parser.parse(await request.read())
+
+        if (
+            message["operation-attributes"]["requested-attributes"]
+            != CHANGE_PRINTER_ATTRIBUTES
+        ):
+            self.requests.append("full")
+            return Response(
+                body=b"\x02" if self.broken else load_fixture_binary(
+                    "get-printer-attributes-epsonxp6000.bin",
+                ),
+                content_type="application/ipp",
+            )
+
+        self.requests.append("changes")
+        return Response(
+            body=encode_dict(
+                {
+                    "version": (2, 0),
+                    "operation": IppStatus.OK,
+                    "request-id": message["request-id"],
+                    "operation-attributes-tag": {
+                        "attributes-charset": "utf-8",
+                        "attributes-natural-language": "en-us",
+                    },
+                    "printer-attributes-tag": self.change_times,
+                },
+            ),
+            content_type="application/ipp",
+        )
+
+
+@pytest.mark.asyncio
+async def test_printer_delta_polling(aresponses: ResponsesMockServer) -> None:
+    """Test the printer is only polled in full once it changed."""
+    printer = _ChangingPrinter(
+        {
+            "printer-state-change-time": 10,
+            "printer-config-change-time": 5,
+            "printer-up-time": 783801,
+        },
+    )
+    for _ in range(8):
+        aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", printer.handler)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, delta_polling=True)
+
+        first = await ipp.printer()
+        assert printer.requests == ["changes", "full"]
+
+        printer.change_times["printer-up-time"] = 783811
+        assert await ipp.printer() is first
+        assert first.info.uptime == 783811
+        assert printer.requests[2:] == ["changes"]
+
+        printer.change_times["printer-state-change-time"] = 20
+        await ipp.printer()
+        assert printer.requests[3:] == ["changes", "full"]
+
+        # rebooted, so the up-time went back
+        printer.change_times["printer-up-time"] = 60
+        await ipp.printer()
+        assert printer.requests[5:] == ["changes", "full"]
+
+        # the up-time of the full poll is the one compared from now on
+        printer.change_times["printer-up-time"] = 783900
+        await ipp.printer()
+        assert printer.requests[7:] == ["changes"]
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_printer_delta_polling_failed(aresponses: ResponsesMockServer) -> None:
+    """Test a full poll which failed is made again on the next poll."""
+    printer = _ChangingPrinter(
+        {
+            "printer-state-change-time": 10,
+            "printer-config-change-time": 5,
+            "printer-up-time": 783801,
+        },
+    )
+    for _ in range(6):
+        aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", printer.handler)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, delta_polling=True)
+        await ipp.printer()
+
+        printer.change_times["printer-state-change-time"] = 20
+        printer.broken = True
+        with pytest.raises(IPPParseError):
+            await ipp.printer()
+
+        printer.broken = False
+        await ipp.printer()
+
+    assert printer.requests == ["changes", "full"] * 3
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_printer_delta_polling_unsupported(
+    aresponses: ResponsesMockServer,
+) -> None:
+    """Test printers lacking change times are polled in full."""
+    printer = _ChangingPrinter({"printer-up-time": 783801})
+    for _ in range(3):
+        aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", printer.handler)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session, delta_polling=True)
+
+        await ipp.printer()
+        await ipp.printer()
+
+    assert printer.requests == ["changes", "full", "full"]
+    aresponses.assert_plan_strictly_followed()
 
 
 @pytest.mark.asyncio
@@ -94,3 +244,274 @@ async def test_raw(aresponses: ResponsesMockServer) -> None:
 
         assert response
         assert isinstance(response, bytes)
+
+
+@pytest.mark.asyncio
+async def test_execute_request(aresponses: ResponsesMockServer) -> None:
+    """Test execute method accepts a request builder."""
+    received = []
+
+    async def response_handler(request: Request) -> Response:
+        """Record the request body and respond."""
+        received.append(await request.read())
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        )
+
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        response = await ipp.execute(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            IppRequest(
+                IppOperation.GET_PRINTER_ATTRIBUTES,
+                request_id=1,
+            ).operation_attr("requested-attributes", DEFAULT_PRINTER_ATTRIBUTES),
+        )
+
+        assert response["printers"]
+        assert received[0] == ipp.template(
+            IppOperation.GET_PRINTER_ATTRIBUTES,
+            {
+                "operation-attributes-tag": {
+                    "requested-attributes": DEFAULT_PRINTER_ATTRIBUTES,
+                },
+            },
+        ).encode(request_id=1)
+
+
+@pytest.mark.asyncio
+async def test_execute_request_operation() -> None:
+    """Test execute method rejects a request for another operation."""
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+
+        with pytest.raises(ValueError, match="PRINT_JOB"):
+            await ipp.execute(
+                IppOperation.GET_PRINTER_ATTRIBUTES,
+                IppRequest(IppOperation.PRINT_JOB),
+            )
+
+
+@pytest.mark.asyncio
+async def test_stream(aresponses: ResponsesMockServer) -> None:
+    """Test stream method yields attribute groups."""
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-jobs-kyocera-ecosys-m2540dn-000.bin"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        groups = [
+            group
+            async for group in ipp.stream(
+                IppOperation.GET_JOBS,
+                {
+                    "operation-attributes-tag": {
+                        "requested-attributes": DEFAULT_JOB_ATTRIBUTES,
+                    },
+                },
+                chunk_size=64,
+            )
+        ]
+
+        assert [key for key, _ in groups] == ["operation-attributes", "jobs"]
+        assert groups[1][1]["job-id"]
+
+
+@pytest.mark.asyncio
+async def test_download(aresponses: ResponsesMockServer, tmp_path: Path) -> None:
+    """Test download method streams the document to its destination."""
+    document = b"%PDF-1.4" * 4096
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-response-000.bin")
+            + document,
+        ),
+        repeat=2,
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        message = {"operation-attributes-tag": {"job-id": 1, "document-number": 1}}
+
+        response = await ipp.download(
+            IppOperation.CUPS_GET_DOCUMENT,
+            message,
+            tmp_path / "document.pdf",
+            chunk_size=1024,
+        )
+        assert response["operation-attributes"]["requesting-user-name"] == "PythonIPP"
+        assert response["data"] == b""
+        assert (tmp_path / "document.pdf").read_bytes() == document
+
+        chunks: list[bytes] = []
+
+        async def write(chunk: bytes) -> None:
+            chunks.append(chunk)
+
+        await ipp.download(IppOperation.CUPS_GET_DOCUMENT, message, write)
+        assert b"".join(chunks) == document
+
+
+@pytest.mark.asyncio
+async def test_execute_document_stream(
+    aresponses: ResponsesMockServer,
+    tmp_path: Path,
+) -> None:
+    """Test a document file is streamed as the request body."""
+    received = []
+
+    async def response_handler(request: Request) -> Response:
+        """Record the request body and respond."""
+        received.append(await request.read())
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        )
+
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+
+    document = tmp_path / "document.pdf"
+    document.write_bytes(b"%PDF-" + bytes(100000))
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        response = await ipp.execute(
+            IppOperation.PRINT_JOB,
+            {
+                "operation-attributes-tag": {
+                    "document-format": "application/pdf",
+                },
+                "data": document,
+            },
+        )
+
+        assert response["status-code"] == 0
+        assert received[0].endswith(b"\x03%PDF-" + bytes(100000))
+        assert b"application/pdf" in received[0]
+
+
+@pytest.mark.asyncio
+async def test_create_subscription(aresponses: ResponsesMockServer) -> None:
+    """Test creating a pull subscription."""
+    received = []
+
+    async def response_handler(request: Request) -> Response:
+        """Record the request and respond."""
+        received.append(parser.parse(await request.read()))
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("create-printer-subscriptions-response.bin"),
+        )
+
+    aresponses.add(MATCH_DEFAULT_HOST, DEFAULT_PRINTER_PATH, "POST", response_handler)
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+        subscription = await ipp.create_subscription(lease_duration=120)
+
+        assert subscription == {
+            "notify-subscription-id": 42,
+            "notify-lease-duration": 120,
+        }
+
+    assert received[0]["status-code"] == IppOperation.CREATE_PRINTER_SUBSCRIPTIONS
+    assert received[0]["subscriptions"] == [
+        {
+            "notify-pull-method": "ippget",
+            "notify-events": ["printer-state-changed", "printer-config-changed"],
+            "notify-lease-duration": 120,
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_events(aresponses: ResponsesMockServer) -> None:
+    """Test long polling events of a subscription."""
+    received = []
+    notifications = [
+        "get-notifications-response.bin",
+        "get-notifications-error-0x0406.bin",
+        "get-notifications-response.bin",
+    ]
+
+    async def response_handler(request: Request) -> Response:
+        """Record the request and respond to the operation."""
+        message = parser.parse(await request.read())
+        received.append(message)
+
+        if message["status-code"] == IppOperation.GET_NOTIFICATIONS:
+            fixture = notifications.pop(0)
+        else:
+            fixture = "create-printer-subscriptions-response.bin"
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary(fixture),
+        )
+
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        response_handler,
+        repeat=aresponses.INFINITY,
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(DEFAULT_PRINTER_URI, session=session)
+
+        events = []
+        subscription = ipp.events(wait=True)
+        async for event in subscription:
+            events.append(event)
+
+            if len(events) == 4:
+                break
+
+        await subscription.aclose()
+
+    assert isinstance(events[0], Event)
+    assert [event.sequence_number for event in events] == [1, 2, 1, 2]
+    assert [event.printer_state for event in events] == ["printing", "idle"] * 2
+    assert events[0].subscription_id == 42
+    assert events[0].text == "Printer started printing"
+    assert events[0].attributes["printer-up-time"] == 1001
+
+    assert [message["status-code"] for message in received] == [
+        IppOperation.CREATE_PRINTER_SUBSCRIPTIONS,
+        IppOperation.GET_NOTIFICATIONS,
+        IppOperation.GET_NOTIFICATIONS,
+        IppOperation.CREATE_PRINTER_SUBSCRIPTIONS,
+        IppOperation.GET_NOTIFICATIONS,
+        IppOperation.CANCEL_SUBSCRIPTION,
+    ]
+    assert [
+        message["operation-attributes"]["notify-sequence-numbers"]
+        for message in received
+        if message["status-code"] == IppOperation.GET_NOTIFICATIONS
+    ] == [1, 3, 1]
+    assert received[1]["operation-attributes"]["notify-wait"] is True
+    assert received[-1]["operation-attributes"]["notify-subscription-id"] == 42
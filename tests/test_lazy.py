@@ -0,0 +1,69 @@
+"""Tests for Lazy Response View."""
+import pytest
+
+from pyipp import parser
+from pyipp.enums import IppPrinterState
+from pyipp.lazy import AttributeView, LazyResponse
+
+from . import load_fixture_binary
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    [
+        "get-jobs-kyocera-ecosys-m2540dn-000.bin",
+        "get-printer-attributes-brother-mfcj5320dw.bin",
+        "get-printer-attributes-empty-attribute-group.bin",
+        "get-printer-attributes-epsonxp6000.bin",
+        "get-printer-attributes-error-0x0503.bin",
+        "get-printer-attributes-hp6830.bin",
+        "get-printer-attributes-kyocera-ecosys-m2540dn-001.bin",
+        "get-printer-attributes-response-000.bin",
+    ],
+)
+def test_lazy_response_matches_parse(fixture: str) -> None:
+    """Test the lazy response decodes to the same data as the parse method."""
+    response = load_fixture_binary(fixture)
+    expected = parser.parse(response)
+
+    result = LazyResponse(response)
+    assert list(result) == list(expected)
+    assert result["version"] == expected["version"]
+    assert result["status-code"] == expected["status-code"]
+    assert result["request-id"] == expected["request-id"]
+    assert dict(result["operation-attributes"]) == expected["operation-attributes"]
+
+    for key in (
+        "unsupported-attributes",
+        "jobs",
+        "printers",
+        "subscriptions",
+        "events",
+    ):
+        assert [dict(group) for group in result[key]] == expected[key]
+
+
+def test_lazy_response_decodes_on_access() -> None:
+    """Test the lazy response only decodes and memoizes accessed attributes."""
+    response = load_fixture_binary("get-printer-attributes-epsonxp6000.bin")
+
+    printer = LazyResponse(response)["printers"][0]
+    assert isinstance(printer, AttributeView)
+    assert "printer-state" in printer
+    assert printer._values == {}
+
+    assert printer["printer-state"] == IppPrinterState.IDLE
+    assert list(printer._values) == ["printer-state"]
+    assert printer["printer-state"] is printer._values["printer-state"]
+
+    with pytest.raises(KeyError):
+        assert printer["no-such-attribute"]
+
+
+def test_lazy_response_contains_data() -> None:
+    """Test the lazy response exposes trailing document data without a copy."""
+    response = load_fixture_binary("get-printer-attributes-response-000.bin")
+
+    result = LazyResponse(response + b"document", contains_data=True)
+    assert isinstance(result["data"], memoryview)
+    assert result["data"] == b"document"
@@ -1,10 +1,12 @@
 """Tests for Parser."""
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from syrupy.assertion import SnapshotAssertion
 
 from pyipp import IPPParseError, parser
 from pyipp.const import DEFAULT_CHARSET, DEFAULT_CHARSET_LANGUAGE, DEFAULT_PROTO_VERSION
-from pyipp.enums import IppOperation
+from pyipp.enums import IppOperation, IppPrinterState
 
 from . import load_fixture_binary
 
@@ -27,9 +29,11 @@ def test_parse() -> None:
             "printer-uri": "ipp://printer.example.com:361/ipp/print",
             "requesting-user-name": "PythonIPP",
         },
+        "events": [],
         "printers": [],
         "request-id": 1,
         "status-code": IppOperation.GET_PRINTER_ATTRIBUTES,
+        "subscriptions": [],
         "unsupported-attributes": [],
         "version": DEFAULT_PROTO_VERSION,
     }
@@ -50,6 +54,31 @@ def test_parse_attribute() -> None:
     )
 
 
+def test_decode_attribute() -> None:
+    """Test the decode_attribute method."""
+    result = parser.decode_attribute(RESPONSE_GET_PRINTER_ATTRIBUTES, 9)
+    assert result == (71, "attributes-charset", "utf-8", 37)
+
+    result = parser.decode_attribute(b"#\x00\x00\x00\x04\x00\x00\x00\x03", 0, "printer-state")
+    assert result == (35, "", IppPrinterState.IDLE, 9)
+
+
+def test_decode_attribute_unknown_enum() -> None:
+    """Test the decode_attribute method keeps unknown enum values as int."""
+    result = parser.decode_attribute(
+        b"#\x00\x14operations-supported\x00\x04\x00\x00\x40\x99",
+        0,
+    )
+    assert result == (35, "operations-supported", 0x4099, 29)
+    assert type(result[2]) is int
+
+    result = parser.decode_attribute(
+        b"#\x00\x14operations-supported\x00\x04\x00\x00\x00\x0b",
+        0,
+    )
+    assert result[2] is IppOperation.GET_PRINTER_ATTRIBUTES
+
+
 def test_parse_attribute_reserved_string() -> None:
     """Test the parse_attribute method when provided a reserved string."""
     result = parser.parse_attribute(b"C\x00\x0freserved-string\x00\x04yoda", 0)
@@ -173,3 +202,94 @@ def test_parse_empty_attribute_group(snapshot: SnapshotAssertion) -> None:
 
     result = parser.parse(response)
     assert result == snapshot
+
+
+def test_parse_hp6830(snapshot: SnapshotAssertion) -> None:
+    """Test the parse method against response from HP OfficeJet Pro 6830."""
+    response = load_fixture_binary("get-printer-attributes-hp6830.bin")
+
+    result = parser.parse(response)
+    assert result == snapshot
+
+
+def test_parse_get_jobs_kyocera_ecosys_m2540dn(snapshot: SnapshotAssertion) -> None:
+    """Test the parse method against Get-Jobs response from Kyocera Ecosys M2540DN."""
+    response = load_fixture_binary("get-jobs-kyocera-ecosys-m2540dn-000.bin")
+
+    result = parser.parse(response)
+    assert result == snapshot
+
+
+def test_parse_attributes_allow_list() -> None:
+    """Test the parse method only decodes allowed attributes."""
+    response = load_fixture_binary("get-printer-attributes-hp6830.bin")
+    expected = parser.parse(response)
+
+    result = parser.parse(
+        response,
+        attributes=["printer-name", "printer-state", "media-col-default"],
+    )
+    assert result["operation-attributes"] == expected["operation-attributes"]
+    assert result["printers"] == [
+        {
+            key: value
+            for key, value in expected["printers"][0].items()
+            if key in ("printer-name", "printer-state", "media-col-default")
+        },
+    ]
+
+
+def test_parse_attributes_deny_list() -> None:
+    """Test the parse method skips excluded attributes and their values."""
+    response = load_fixture_binary("get-printer-attributes-hp6830.bin")
+    expected = parser.parse(response)
+    exclude = ["media-col-ready", "media-supported", "operations-supported"]
+
+    result = parser.parse(response, exclude=exclude)
+    assert result["printers"] == [
+        {
+            key: value
+            for key, value in expected["printers"][0].items()
+            if key not in exclude
+        },
+    ]
+
+
+def test_parse_attribute_date() -> None:
+    """Test the parse_attribute method with a date shares timezone objects."""
+    date = b"1\x00\x14printer-current-time\x00\x0b\x07\xea\x0a\x11\x0c\x1e\x2d\x05+\x02\x00"
+
+    first, _ = parser.parse_attribute(date, 0)
+    second, _ = parser.parse_attribute(date, 0)
+
+    assert first["value"] == datetime(
+        2026, 10, 17, 12, 30, 45, 500_000, timezone(timedelta(hours=2)),
+    )
+    assert first["value"].tzinfo is second["value"].tzinfo
+
+
+def test_parse_epoch_dates() -> None:
+    """Test the parse method returning dates as seconds since the epoch."""
+    response = load_fixture_binary("get-printer-attributes-hp6830.bin")
+
+    expected = parser.parse(response)["printers"][0]["printer-current-time"]
+    result = parser.parse(response, epoch_dates=True)["printers"][0]
+
+    assert result["printer-current-time"] == expected.timestamp()
+
+
+def test_parse_notification_groups() -> None:
+    """Test the parse method with subscription and event notification groups."""
+    response = load_fixture_binary("create-printer-subscriptions-response.bin")
+
+    result = parser.parse(response)
+    assert result["subscriptions"] == [
+        {"notify-subscription-id": 42, "notify-lease-duration": 120},
+    ]
+
+    response = load_fixture_binary("get-notifications-response.bin")
+
+    result = parser.parse(response)
+    assert result["operation-attributes"]["notify-get-interval"] == 30
+    assert [event["notify-sequence-number"] for event in result["events"]] == [1, 2]
+    assert result["events"][1]["printer-state"] == IppPrinterState.IDLE
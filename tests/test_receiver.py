@@ -0,0 +1,130 @@
+"""Tests for Notification Receiver."""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiohttp import ClientSession
+
+from pyipp import Event, NotificationReceiver, parser
+from pyipp.const import DEFAULT_CHARSET, DEFAULT_CHARSET_LANGUAGE
+from pyipp.enums import IppOperation, IppPrinterState, IppStatus, IppTag
+from pyipp.serializer import encode_dict
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+def _notification(operation: IppOperation, events: list[dict[str, Any]]) -> bytes:
+    """Encode a notification request as a printer would send it."""
+    return encode_dict(
+        {
+            "version": (1, 1),
+            "operation": operation,
+            "request-id": 7,
+            "operation-attributes-tag": {
+                "attributes-charset": DEFAULT_CHARSET,
+                "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
+            },
+            "event-notification-attributes-tag": events,
+        },
+    )
+
+
+def _event(subscription_id: int, sequence_number: int) -> dict[str, Any]:
+    """Return the attributes of a printer state event."""
+    return {
+        "notify-subscription-id": subscription_id,
+        "notify-sequence-number": sequence_number,
+        "notify-subscribed-event": "printer-state-changed",
+        "printer-state": IppPrinterState.STOPPED,
+    }
+
+
+async def _collect(events: AsyncGenerator[Event, None], count: int) -> list[Event]:
+    """Collect a number of events from a listener."""
+    result = []
+
+    async for event in events:
+        result.append(event)
+
+        if len(result) == count:
+            break
+
+    await events.aclose()
+
+    return result
+
+
+def test_recipient_uri() -> None:
+    """Test the recipient uri is only given for reachable hosts."""
+    receiver = NotificationReceiver(port=8631)
+    with pytest.raises(ValueError, match="advertise_host"):
+        assert receiver.recipient_uri
+
+    receiver = NotificationReceiver(port=8631, advertise_host="fe80::1")
+    assert receiver.recipient_uri == "ipp://[fe80::1]:8631/ipp/notify"
+
+
+@pytest.mark.asyncio
+async def test_notification_receiver() -> None:
+    """Test events pushed by a printer are fanned out to listeners."""
+    async with NotificationReceiver(host="127.0.0.1") as receiver:
+        assert receiver.port != 0
+        assert receiver.recipient_uri == f"ipp://127.0.0.1:{receiver.port}/ipp/notify"
+
+        called = []
+        remove_callback = receiver.add_callback(called.append)
+
+        every = asyncio.create_task(_collect(receiver.listen(), 3))
+        only = asyncio.create_task(_collect(receiver.listen([42]), 2))
+        await asyncio.sleep(0)
+
+        url = f"http://127.0.0.1:{receiver.port}/ipp/notify"
+
+        async with ClientSession() as session:
+            response = await session.post(
+                url,
+                data=_notification(
+                    IppOperation.SEND_NOTIFICATIONS,
+                    [_event(42, 1), _event(7, 1)],
+                ),
+            )
+            message = parser.parse(await response.read())
+
+            assert message["status-code"] == IppStatus.OK
+            assert message["request-id"] == 7
+            assert message["version"] == (1, 1)
+
+            remove_callback()
+
+            response = await session.post(
+                url,
+                data=_notification(IppOperation.SEND_NOTIFICATIONS, [_event(42, 2)]),
+            )
+            assert response.status == 200
+
+            response = await session.post(
+                url,
+                data=_notification(IppOperation.GET_NOTIFICATIONS, [_event(42, 3)]),
+            )
+            message = parser.parse(await response.read())
+            assert message["status-code"] == IppStatus.ERROR_OPERATION_NOT_SUPPORTED
+
+            response = await session.post(url, data=bytes([IppTag.OPERATION]))
+            assert response.status == 400
+
+        events = await every
+        assert [(event.subscription_id, event.sequence_number) for event in events] == [
+            (42, 1),
+            (7, 1),
+            (42, 2),
+        ]
+        assert events[0].printer_state == "stopped"
+
+        events = await only
+        assert [event.sequence_number for event in events] == [1, 2]
+        assert [event.subscription_id for event in called] == [42, 7]
+
+        assert receiver._queues == {}
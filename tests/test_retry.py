@@ -0,0 +1,303 @@
+"""Tests for Retry Policies and Circuit Breakers."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+from email.utils import formatdate
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp import ClientSession
+
+from pyipp import (
+    IPP,
+    CircuitBreaker,
+    IPPCircuitOpenError,
+    IPPConnectionError,
+    IPPError,
+    IPPResponseError,
+    RetryPolicy,
+)
+from pyipp.enums import IppOperation, IppStatus
+from pyipp.retry import parse_retry_after
+from pyipp.serializer import encode_dict
+
+from . import (
+    DEFAULT_PRINTER_HOST,
+    DEFAULT_PRINTER_PATH,
+    DEFAULT_PRINTER_PORT,
+    DEFAULT_PRINTER_URI,
+    load_fixture_binary,
+)
+
+if TYPE_CHECKING:
+    from aiohttp.web import Request, Response
+    from aresponses import ResponsesMockServer
+
+MATCH_DEFAULT_HOST = f"{DEFAULT_PRINTER_HOST}:{DEFAULT_PRINTER_PORT}"
+
+BUSY_RESPONSE = encode_dict(
+    {
+        "version": (2, 0),
+        "operation": IppStatus.ERROR_BUSY,
+        "request-id": 1,
+        "operation-attributes-tag": {
+            "attributes-charset": "utf-8",
+            "attributes-natural-language": "en-us",
+        },
+    },
+)
+
+
+def _unused_port() -> int:
+    """Return a local port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def test_retry_policy_delays() -> None:
+    """Test the delays of a retry policy back off exponentially."""
+    policy = RetryPolicy(delay=0.5, factor=2, max_delay=3, jitter=False)
+    delays = policy.delays()
+
+    assert [next(delays) for _ in range(5)] == [0.5, 1, 2, 3, 3]
+
+    delays = RetryPolicy(delay=0.5, max_delay=3).delays()
+
+    assert all(0 <= next(delays) <= 3 for _ in range(20))
+
+
+def test_retry_policy_retry_delay() -> None:
+    """Test which errors are retried, and after which delay."""
+    policy = RetryPolicy(max_delay=10)
+
+    assert policy.retry_delay(IPPConnectionError("timeout"), 1) == 1
+    assert policy.retry_delay(IPPCircuitOpenError("open"), 1) is None
+    assert policy.retry_delay(IPPError("status", {"status-code": 0x0507}), 1) == 1
+    assert policy.retry_delay(IPPError("status", {"status-code": 0x0400}), 1) is None
+    assert policy.retry_delay(IPPResponseError("HTTP 404", {"status-code": 404}), 1) is None
+    assert (
+        policy.retry_delay(
+            IPPResponseError("HTTP 503", {"status-code": 503, "retry-after": "5"}),
+            1,
+        )
+        == 5
+    )
+    assert (
+        policy.retry_delay(
+            IPPResponseError("HTTP 503", {"status-code": 503, "retry-after": "60"}),
+            1,
+        )
+        == 10
+    )
+
+
+def test_parse_retry_after() -> None:
+    """Test parsing of Retry-After headers."""
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(formatdate(0, usegmt=True)) == 0
+
+    retry_after = parse_retry_after(formatdate(time.time() + 120, usegmt=True))
+    assert retry_after is not None
+    assert 115 < retry_after <= 120
+
+
+def test_circuit_breaker(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the circuit of a host opens, probes and closes again."""
+    now = 1000.0
+    monkeypatch.setattr("pyipp.retry.time.monotonic", lambda: now)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    assert breaker.allow("printer:631")
+    breaker.record_failure("printer:631")
+    assert breaker.state("printer:631") == "closed"
+    breaker.record_failure("printer:631")
+    assert breaker.state("printer:631") == "open"
+    assert not breaker.allow("printer:631")
+    assert breaker.allow("other:631")
+
+    # a single probe is let through after the reset timeout
+    now += 30
+    assert breaker.allow("printer:631")
+    assert breaker.state("printer:631") == "half-open"
+    assert not breaker.allow("printer:631")
+
+    # a failed probe opens the circuit again
+    breaker.record_failure("printer:631")
+    assert breaker.state("printer:631") == "open"
+    assert not breaker.allow("printer:631")
+
+    now += 30
+    assert breaker.allow("printer:631")
+    breaker.record_success("printer:631")
+    assert breaker.state("printer:631") == "closed"
+    assert breaker.allow("printer:631")
+
+    breaker.record_failure("printer:631")
+    breaker.record_failure("printer:631")
+    breaker.reset()
+    assert breaker.allow("printer:631")
+
+
+@pytest.mark.asyncio
+async def test_execute_retry(aresponses: ResponsesMockServer) -> None:
+    """Test requests are retried on busy statuses until successful."""
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=503,
+            headers={"Content-Type": "text/plain", "Retry-After": "0"},
+            text="Busy",
+        ),
+    )
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=BUSY_RESPONSE,
+        ),
+    )
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/ipp"},
+            body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            retry_policy=RetryPolicy(delay=0, jitter=False),
+        )
+        printer = await ipp.printer()
+
+    assert printer.info.name == "EPSON XP-6000 Series"
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_execute_retry_exhausted(aresponses: ResponsesMockServer) -> None:
+    """Test the last error is raised once the tries are exhausted."""
+    for _ in range(2):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/ipp"},
+                body=BUSY_RESPONSE,
+            ),
+        )
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            retry_policy=RetryPolicy(max_tries=2, delay=0, jitter=False),
+        )
+
+        with pytest.raises(IPPError) as error:
+            await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+    assert error.value.args[1] == {"status-code": IppStatus.ERROR_BUSY}
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_execute_no_retry(aresponses: ResponsesMockServer) -> None:
+    """Test operations which are not idempotent are not retried."""
+    aresponses.add(
+        MATCH_DEFAULT_HOST,
+        DEFAULT_PRINTER_PATH,
+        "POST",
+        aresponses.Response(status=503, text="Busy"),
+    )
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            retry_policy=RetryPolicy(delay=0, jitter=False),
+        )
+
+        with pytest.raises(IPPResponseError):
+            await ipp.execute(IppOperation.PRINT_JOB, {"data": b"document"})
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_circuit_open() -> None:
+    """Test requests to unreachable hosts are short-circuited."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            "127.0.0.1",
+            port=_unused_port(),
+            session=session,
+            circuit_breaker=breaker,
+            retry_policy=RetryPolicy(max_tries=2, delay=0, jitter=False),
+        )
+
+        # both tries fail to connect, opening the circuit
+        with pytest.raises(IPPConnectionError) as error:
+            await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+        assert not isinstance(error.value, IPPCircuitOpenError)
+        assert breaker.state(f"127.0.0.1:{ipp.port}") == "open"
+
+        with pytest.raises(IPPCircuitOpenError):
+            await ipp.execute(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+
+@pytest.mark.asyncio
+async def test_long_poll_timeout(aresponses: ResponsesMockServer) -> None:
+    """Test long polls timing out are neither retried nor count as failures."""
+
+    async def response_handler(_: Request) -> Response:
+        await asyncio.sleep(0.2)
+        return aresponses.Response(status=200, text="")
+
+    for _ in range(2):
+        aresponses.add(
+            MATCH_DEFAULT_HOST,
+            DEFAULT_PRINTER_PATH,
+            "POST",
+            response_handler,
+        )
+
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    async with ClientSession() as session:
+        ipp = IPP(
+            DEFAULT_PRINTER_URI,
+            session=session,
+            circuit_breaker=breaker,
+            retry_policy=RetryPolicy(delay=0, jitter=False),
+        )
+
+        for _ in range(2):
+            with pytest.raises(IPPConnectionError):
+                await ipp.get_notifications([1], wait=True, request_timeout=0.05)
+
+        assert breaker.state(MATCH_DEFAULT_HOST) == "closed"
+
+    aresponses.assert_plan_strictly_followed()
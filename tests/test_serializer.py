@@ -1,10 +1,22 @@
 """Tests for Serializer."""
-from pyipp import serializer
+from __future__ import annotations
+
+import io
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pyipp import parser, serializer
 from pyipp.const import DEFAULT_CHARSET, DEFAULT_CHARSET_LANGUAGE, DEFAULT_PROTO_VERSION
 from pyipp.enums import IppOperation, IppTag
 
 from . import load_fixture_binary
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
 
 def test_construct_attribute_values() -> None:
     """Test the construct_attribute_values method."""
@@ -33,6 +45,90 @@ def test_construct_attribute_values() -> None:
     assert result == b"\x00\x14ipps://localhost:631"
 
 
+@pytest.mark.parametrize(
+    ("tag", "value", "expected"),
+    [
+        (
+            IppTag.DATE,
+            datetime(2026, 10, 17, 12, 30, 5, 300000, timezone(timedelta(hours=-5))),
+            b"\x00\x0b\x07\xea\x0a\x11\x0c\x1e\x05\x03-\x05\x00",
+        ),
+        (
+            IppTag.DATE,
+            datetime(2026, 10, 17),  # noqa: DTZ001
+            b"\x00\x0b\x07\xea\x0a\x11\x00\x00\x00\x00+\x00\x00",
+        ),
+        (
+            IppTag.RESOLUTION,
+            (600, 1200, 3),
+            b"\x00\x09\x00\x00\x02\x58\x00\x00\x04\xb0\x03",
+        ),
+        (
+            IppTag.RANGE,
+            (1, 5),
+            b"\x00\x08\x00\x00\x00\x01\x00\x00\x00\x05",
+        ),
+        (
+            IppTag.TEXT_LANG,
+            ("de", "Hallo"),
+            b"\x00\x0b\x00\x02de\x00\x05Hallo",
+        ),
+        (IppTag.STRING, b"\x00\xff", b"\x00\x02\x00\xff"),
+        (IppTag.NO_VALUE, None, b"\x00\x00"),
+        (IppTag.RESERVED_STRING, None, b"\x00\x00"),
+    ],
+)
+def test_construct_attribute_values_types(
+    tag: IppTag,
+    value: Any,
+    expected: bytes,
+) -> None:
+    """Test the construct_attribute_values method with structured values."""
+    assert serializer.construct_attribute_values(tag, value) == expected
+
+
+def test_construct_attribute_collection() -> None:
+    """Test the construct_attribute method with nested collections."""
+    media_col = {
+        "media-size": {"x-dimension": 21000, "y-dimension": 29700},
+        "media-type": "stationery",
+        "media-top-margin": 0,
+        "media-key": "a4-plain",
+    }
+    result = serializer.construct_attribute("media-col", media_col)
+
+    assert result.startswith(b"\x34\x00\x09media-col\x00\x00\x4a\x00\x00\x00\x0a")
+    assert result.endswith(b"\x37\x00\x00\x00\x00")
+
+    tag, name, value, offset = parser.decode_attribute(result, 0)
+    assert tag == IppTag.BEGIN_COLLECTION
+    assert name == "media-col"
+    assert value == media_col
+    assert offset == len(result)
+
+    # members without any value are left out
+    result = serializer.construct_attribute(
+        "media-col",
+        {"media-source": [], "media-type": "stationery"},
+    )
+    assert b"media-source" not in result
+    assert parser.decode_attribute(result, 0)[2] == {"media-type": "stationery"}
+
+
+def test_construct_attribute_sequence_values() -> None:
+    """Test the construct_attribute method with multiple structured values."""
+    result = serializer.construct_attribute("page-ranges", [(1, 5), (7, 9)])
+    assert result == (
+        b"\x33\x00\x0bpage-ranges\x00\x08\x00\x00\x00\x01\x00\x00\x00\x05"
+        b"\x33\x00\x00\x00\x08\x00\x00\x00\x07\x00\x00\x00\x09"
+    )
+
+    assert serializer.construct_attribute("page-ranges", [1, 5]) == (
+        serializer.construct_attribute("page-ranges", (1, 5))
+    )
+    assert serializer.construct_attribute("page-ranges", ((1, 5), (7, 9))) == result
+
+
 def test_construct_attribute() -> None:
     """Test the construct_attribute method."""
     result = serializer.construct_attribute("attributes-charset", DEFAULT_CHARSET)
@@ -44,6 +140,35 @@ def test_construct_attribute() -> None:
     )
     assert result == b"#\x00\x14operations-supported\x00\x04\x00\x00\x00\x0b"
 
+    result = serializer.construct_attribute(
+        "requested-attributes",
+        ["printer-name", "printer-state"],
+    )
+    assert result == (
+        b"D\x00\x14requested-attributes\x00\x0cprinter-name"
+        b"D\x00\x00\x00\x0dprinter-state"
+    )
+
+
+def test_construct_attribute_with_language() -> None:
+    """Test the construct_attribute method with multiple text values."""
+    result = serializer.construct_attribute(
+        "job-name",
+        ["first", ("de", "zweite"), "third"],
+        IppTag.NAME_LANG,
+    )
+    assert result == (
+        b"\x36\x00\x08job-name\x00\x0e\x00\x05en-US\x00\x05first"
+        b"\x36\x00\x00\x00\x0c\x00\x02de\x00\x06zweite"
+        b"\x36\x00\x00\x00\x0e\x00\x05en-US\x00\x05third"
+    )
+
+    # a single value given as list, as returned by parse() for ranges
+    result = serializer.construct_attribute("copies-supported", [1, 99], IppTag.RANGE)
+    assert result == (
+        b"\x33\x00\x10copies-supported\x00\x08\x00\x00\x00\x01\x00\x00\x00\x63"
+    )
+
 
 def test_construct_attribute_no_tag_unmapped() -> None:
     """Test the construct_attribute method with no tag and unmapped attribute name."""
@@ -74,3 +199,146 @@ def test_encode_dict() -> None:
     assert result == load_fixture_binary(
         "serializer/get-printer-attributes-request-000.bin",
     )
+
+
+def test_request_template() -> None:
+    """Test the request template only patches the request header."""
+    template = serializer.RequestTemplate(
+        {
+            "version": DEFAULT_PROTO_VERSION,
+            "operation": IppOperation.GET_PRINTER_ATTRIBUTES,
+            "request-id": None,
+            "operation-attributes-tag": {
+                "attributes-charset": DEFAULT_CHARSET,
+                "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
+                "printer-uri": "ipp://printer.example.com:361/ipp/print",
+                "requesting-user-name": "PythonIPP",
+            },
+        },
+    )
+
+    expected = load_fixture_binary(
+        "serializer/get-printer-attributes-request-000.bin",
+    )
+    assert template.encode(request_id=1) == expected
+
+    result = template.encode(request_id=2, version=(1, 1))
+    assert result[:8] == b"\x01\x01\x00\x0b\x00\x00\x00\x02"
+    assert result[8:] == expected[8:]
+
+    assert template.encode()[8:] == expected[8:]
+
+
+async def _document_chunks() -> AsyncIterator[bytes]:
+    yield b"%PDF-"
+    yield b"document"
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        b"%PDF-document",
+        memoryview(b"%PDF-document"),
+        io.BytesIO(b"%PDF-document"),
+        _document_chunks(),
+    ],
+)
+async def test_encode_stream(document: Any) -> None:
+    """Test the encode_stream method matches encode_dict."""
+    message = {
+        "version": DEFAULT_PROTO_VERSION,
+        "operation": IppOperation.PRINT_JOB,
+        "request-id": 1,
+        "operation-attributes-tag": {
+            "attributes-charset": DEFAULT_CHARSET,
+            "printer-uri": "ipp://printer.example.com:361/ipp/print",
+        },
+    }
+    expected = serializer.encode_dict({**message, "data": b"%PDF-document"})
+
+    chunks = [
+        bytes(chunk)
+        async for chunk in serializer.encode_stream(
+            {**message, "data": document},
+            chunk_size=4,
+        )
+    ]
+    assert b"".join(chunks) == expected
+
+
+async def test_iter_document_path(tmp_path: Path) -> None:
+    """Test the iter_document method reads files in chunks."""
+    document = tmp_path / "document.pdf"
+    document.write_bytes(b"%PDF-document")
+
+    chunks = [chunk async for chunk in serializer.iter_document(document, 8)]
+    assert chunks == [b"%PDF-doc", b"ument"]
+
+    chunks = [chunk async for chunk in serializer.iter_document(str(document))]
+    assert chunks == [b"%PDF-document"]
+
+    with pytest.raises(TypeError):
+        assert [chunk async for chunk in serializer.iter_document(1)]
+
+
+def test_ipp_request() -> None:
+    """Test the request builder encodes like encode_dict."""
+    request = serializer.IppRequest(
+        IppOperation.GET_PRINTER_ATTRIBUTES,
+        request_id=1,
+    ).operation_attr("requesting-user-name", "PythonIPP")
+
+    result = request.encode(
+        {
+            "attributes-charset": DEFAULT_CHARSET,
+            "attributes-natural-language": DEFAULT_CHARSET_LANGUAGE,
+            "printer-uri": "ipp://printer.example.com:361/ipp/print",
+            "requesting-user-name": "Default",
+        },
+        DEFAULT_PROTO_VERSION,
+    )
+    assert result == load_fixture_binary(
+        "serializer/get-printer-attributes-request-000.bin",
+    )
+
+    message = {
+        "version": (1, 1),
+        "operation": IppOperation.PRINT_JOB,
+        "request-id": 2,
+        "operation-attributes-tag": {
+            "attributes-charset": DEFAULT_CHARSET,
+            "job-name": "Test Job",
+        },
+        "job-attributes-tag": {
+            "copies": 2,
+            "page-ranges": (1, 5),
+        },
+        "printer-attributes-tag": {
+            "printer-info": "Printer",
+        },
+        "data": b"%PDF-document",
+    }
+    request = (
+        serializer.IppRequest(IppOperation.PRINT_JOB, version=(1, 1), request_id=2)
+        .job_attr("copies", 2)
+        .printer_attr("printer-info", "Printer")
+        .operation_attr("job-name", "Test Job")
+        .job_attr("page-ranges", (1, 5))
+        .document(b"%PDF-document")
+    )
+    result = request.encode({"attributes-charset": DEFAULT_CHARSET}, (2, 0))
+    assert result == serializer.encode_dict(message)
+
+
+async def test_ipp_request_stream() -> None:
+    """Test the request builder streams its document."""
+    request = (
+        serializer.IppRequest(IppOperation.SEND_DOCUMENT, request_id=1)
+        .operation_attr("job-id", 1)
+        .operation_attr("x-vendor-option", "on", IppTag.KEYWORD)
+        .document(_document_chunks())
+    )
+
+    chunks = [bytes(chunk) async for chunk in request.encode_stream()]
+    assert chunks[0].endswith(b"\x44\x00\x0fx-vendor-option\x00\x02on\x03")
+    assert b"".join(chunks[1:]) == b"%PDF-document"
@@ -0,0 +1,94 @@
+"""Tests for Streaming Parser."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from pyipp import IPPParseError, parser
+from pyipp.stream import StreamParser
+
+from . import load_fixture_binary
+
+
+def _collect(response: bytes, chunk_size: int) -> dict[str, Any]:
+    """Feed a response in chunks and collect the groups like the parse method."""
+    stream_parser = StreamParser()
+    result: dict[str, Any] = {
+        "operation-attributes": [],
+        "unsupported-attributes": [],
+        "jobs": [],
+        "printers": [],
+        "subscriptions": [],
+        "events": [],
+    }
+
+    for index in range(0, len(response), chunk_size):
+        for key, group in stream_parser.feed(response[index : index + chunk_size]):
+            result[key].append(group)
+
+    stream_parser.close()
+
+    result["operation-attributes"] = result["operation-attributes"][0]
+    result["version"] = stream_parser.version
+    result["status-code"] = stream_parser.status_code
+    result["request-id"] = stream_parser.request_id
+    result["data"] = b""
+
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+@pytest.mark.parametrize(
+    "fixture",
+    [
+        "get-jobs-kyocera-ecosys-m2540dn-000.bin",
+        "get-printer-attributes-brother-mfcj5320dw.bin",
+        "get-printer-attributes-empty-attribute-group.bin",
+        "get-printer-attributes-hp6830.bin",
+    ],
+)
+def test_stream_parser_matches_parse(fixture: str, chunk_size: int) -> None:
+    """Test the stream parser yields the same groups as the parse method."""
+    response = load_fixture_binary(fixture)
+
+    assert _collect(response, chunk_size) == parser.parse(response)
+
+
+def test_stream_parser_yields_complete_groups() -> None:
+    """Test groups are returned as soon as the next group starts."""
+    response = load_fixture_binary("get-jobs-kyocera-ecosys-m2540dn-000.bin")
+    stream_parser = StreamParser()
+
+    groups = stream_parser.feed(response[:-1])
+    assert [key for key, _ in groups] == ["operation-attributes"]
+    assert stream_parser.status_code == 0
+    assert not stream_parser.complete
+
+    groups = stream_parser.feed(response[-1:])
+    assert [key for key, _ in groups] == ["jobs"]
+    assert stream_parser.complete
+    assert stream_parser._buffer == b""
+
+
+def test_stream_parser_truncated() -> None:
+    """Test closing the stream parser before the end of attributes tag."""
+    response = load_fixture_binary("get-printer-attributes-epsonxp6000.bin")
+    stream_parser = StreamParser()
+    stream_parser.feed(response[:100])
+
+    with pytest.raises(IPPParseError):
+        stream_parser.close()
+
+
+def test_stream_parser_contains_data() -> None:
+    """Test the stream parser hands out the trailing document data."""
+    response = load_fixture_binary("get-printer-attributes-response-000.bin")
+    stream_parser = StreamParser(contains_data=True)
+
+    stream_parser.feed(response + b"doc")
+    stream_parser.feed(b"ument")
+    assert stream_parser.take_data() == [b"doc", b"ument"]
+    assert stream_parser.take_data() == []
+
+    stream_parser.close()
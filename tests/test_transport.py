@@ -0,0 +1,220 @@
+"""Tests for Transports."""
+from __future__ import annotations
+
+import asyncio
+import socket
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiohttp import web
+
+from pyipp import (
+    IPP,
+    AiohttpTransport,
+    IPPConnectionError,
+    IPPResponseError,
+    StreamTransport,
+    Transport,
+)
+from pyipp.enums import IppOperation
+
+from . import load_fixture_binary
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+HEADERS = {"Content-Type": "application/ipp"}
+
+
+async def _handle(request: web.Request) -> web.StreamResponse:
+    """Echo the request body, in chunks if asked to."""
+    body = await request.read()
+    state = request.app["state"]
+    state["peers"].add(request.transport.get_extra_info("peername"))
+    state["bodies"].append(body)
+
+    if request.path == "/chunked":
+        response = web.StreamResponse(headers=HEADERS)
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        await response.write(body[:3])
+        await response.write(body[3:])
+        await response.write_eof()
+
+        return response
+
+    if request.path == "/busy":
+        return web.Response(status=503, text="Busy", headers={"Retry-After": "1"})
+
+    return web.Response(body=body, headers=HEADERS)
+
+
+async def _printer(request: web.Request) -> web.Response:
+    """Answer like a printer."""
+    await request.read()
+
+    return web.Response(
+        body=load_fixture_binary("get-printer-attributes-epsonxp6000.bin"),
+        headers=HEADERS,
+    )
+
+
+@pytest.fixture(name="server")
+async def fixture_server() -> AsyncGenerator[dict[str, Any], None]:
+    """Run a local HTTP server, yielding its state."""
+    state: dict[str, Any] = {"peers": set(), "bodies": []}
+
+    app = web.Application()
+    app["state"] = state
+    app.router.add_post("/echo", _handle)
+    app.router.add_post("/busy", _handle)
+    app.router.add_post("/chunked", _handle)
+    app.router.add_post("/ipp/print", _printer)
+
+    runner = web.AppRunner(app, access_log=None, keepalive_timeout=0.2)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    state["port"] = runner.addresses[0][1]
+
+    yield state
+
+    await runner.cleanup()
+
+
+@pytest.mark.parametrize("transport", [AiohttpTransport, StreamTransport])
+@pytest.mark.asyncio
+async def test_post(server: dict[str, Any], transport: type[Transport]) -> None:
+    """Test requests are posted and connections kept alive."""
+    client = transport()
+
+    for body in (b"first", b"second", b"third" * 10000):
+        response = await client.post("127.0.0.1", server["port"], "/echo", body, HEADERS)
+        assert response.status == 200
+        assert response.headers["Content-Type"] == "application/ipp"
+        assert response.body == body
+
+    response = await client.post(
+        "127.0.0.1",
+        server["port"],
+        "/chunked",
+        b"chunked",
+        HEADERS,
+    )
+    assert response.body == b"chunked"
+
+    await client.close()
+
+    assert len(server["peers"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_transport_stale(server: dict[str, Any]) -> None:
+    """Test connections closed by the server are replaced."""
+    client = StreamTransport()
+
+    assert (await client.post("127.0.0.1", server["port"], "/echo", b"1", HEADERS)).body
+    await asyncio.sleep(0.5)
+    assert (await client.post("127.0.0.1", server["port"], "/echo", b"2", HEADERS)).body
+
+    await client.close()
+
+    assert server["bodies"] == [b"1", b"2"]
+    assert len(server["peers"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_transport_closed_unanswered() -> None:
+    """Test only idempotent requests are sent again when left unanswered."""
+    requests = []
+
+    async def handle(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        # answers the first request of each connection, closes on the second
+        for answer in (True, False):
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            requests.append(await reader.readexactly(length))
+
+            if answer:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = StreamTransport()
+
+    try:
+        assert (await client.post("127.0.0.1", port, "/", b"1", HEADERS)).body
+        with pytest.raises(IPPConnectionError):
+            await client.post("127.0.0.1", port, "/", b"2", HEADERS)
+
+        assert (
+            await client.post("127.0.0.1", port, "/", b"3", HEADERS, idempotent=True)
+        ).body
+        assert (
+            await client.post("127.0.0.1", port, "/", b"4", HEADERS, idempotent=True)
+        ).body
+    finally:
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    assert requests == [b"1", b"2", b"3", b"4", b"4"]
+
+
+def test_stream_transport_host() -> None:
+    """Test the host header of requests, with IPv6 literals in brackets."""
+    transport = StreamTransport()
+
+    head = transport._head("printer", 631, "/ipp/print", HEADERS)
+    assert b"\r\nHost: printer:631\r\n" in head
+
+    head = transport._head("::1", 631, "/ipp/print", HEADERS)
+    assert b"\r\nHost: [::1]:631\r\n" in head
+
+
+def test_transport_abstract() -> None:
+    """Test transports have to implement post()."""
+    with pytest.raises(TypeError):
+        Transport()  # type: ignore[abstract]
+
+
+@pytest.mark.asyncio
+async def test_stream_transport_refused() -> None:
+    """Test connection failures are raised as IPPConnectionError."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(IPPConnectionError):
+        await StreamTransport().post("127.0.0.1", port, "/", b"", HEADERS)
+
+
+@pytest.mark.asyncio
+async def test_ipp_transport(server: dict[str, Any]) -> None:
+    """Test the client sends requests over the transport given."""
+    transport = StreamTransport()
+
+    async with IPP(
+        "127.0.0.1",
+        port=server["port"],
+        transport=transport,
+    ) as ipp:
+        printer = await ipp.printer()
+        assert printer.info.name == "EPSON XP-6000 Series"
+        assert await ipp.printer()
+
+        # no session is needed for requests over the transport
+        assert ipp.session is None
+
+        ipp.base_path = "/busy"
+        with pytest.raises(IPPResponseError) as error:
+            await ipp.raw(IppOperation.GET_PRINTER_ATTRIBUTES, {})
+
+        assert error.value.args[1]["retry-after"] == "1"
+
+    await transport.close()